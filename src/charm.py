@@ -7,16 +7,15 @@
 import logging
 from pathlib import Path
 from requests.exceptions import ConnectionError as RequestsConnectionError
-from urllib3.exceptions import NewConnectionError, MaxRetryError
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 import time
-import re
 
 import ops
 
 from interface_prometheus import PrometheusProvider
 from interface_rpc_url_provider import RpcUrlProvider
 from interface_rpc_url_requirer import RpcUrlRequirer
-from polkadot_rpc_wrapper import PolkadotRpcWrapper
+from polkadot_rpc_wrapper import PolkadotRpcWrapper, RpcError
 import utils
 from service_args import ServiceArgs
 
@@ -70,6 +69,7 @@ class PolkadotCharm(ops.CharmBase):
                                  chain_spec_url=self.config.get('chain-spec-url'),
                                  local_relaychain_spec_url=self.config.get('local-relaychain-spec-url'),
                                  wasm_runtime_url=self.config.get('wasm-runtime-url'),
+                                 binary_md5sum={},
                                  )
 
     def rpc_urls(self):
@@ -82,9 +82,9 @@ class PolkadotCharm(ops.CharmBase):
 
     def _on_install(self, event: ops.InstallEvent) -> None:
         self.unit.status = ops.MaintenanceStatus("Begin installing charm")
-        service_args_obj = ServiceArgs(self.config, self.rpc_urls())
-        # Setup polkadot group and user, disable login
+        # Setup polkadot group and user, disable login. Done first, since the chain specs downloaded below are given to the user.
         utils.setup_group_and_user()
+        service_args_obj = ServiceArgs.get(self.config, self.rpc_urls())
         # Create environment file for polkadot service arguments
         utils.create_env_file_for_service()
         # Download and prepare the binary
@@ -103,7 +103,7 @@ class PolkadotCharm(ops.CharmBase):
 
     def _on_config_changed(self, event: ops.ConfigChangedEvent) -> None:
         try:
-            service_args_obj = ServiceArgs(self.config, self.rpc_urls())
+            service_args_obj = ServiceArgs.get(self.config, self.rpc_urls())
         except ValueError as e:
             self.unit.status = ops.BlockedStatus(str(e))
             event.defer()
@@ -166,22 +166,22 @@ class PolkadotCharm(ops.CharmBase):
         During a benchmark, it took 20 seconds on Kusama where there are 1000 validators.
         """
         if utils.service_started():
-            service_args = ServiceArgs(self.config, self.rpc_urls())
+            service_args = ServiceArgs.get(self.config, self.rpc_urls())
             rpc_port = service_args.rpc_port
             for i in range(connection_attempts):
                 time.sleep(5)
                 try:
-                    is_syncing = str(PolkadotRpcWrapper(rpc_port).is_syncing())
-                    status_message = f'Syncing: {is_syncing}'
+                    rpc_wrapper = PolkadotRpcWrapper(rpc_port)
+                    status_message = f'Syncing: {rpc_wrapper.is_syncing()}'
                     if validator_check and service_args.is_validator:
-                        if PolkadotRpcWrapper(rpc_port).is_validating_this_era():
+                        if rpc_wrapper.is_validating_this_era():
                             status_message += ", Validating: Yes"
                         else:
                             status_message += ", Validating: No"
                     self.unit.status = ops.ActiveStatus(status_message)
                     self.unit.set_workload_version(utils.get_binary_version())
                     break
-                except RequestsConnectionError as e:
+                except (RequestsConnectionError, Urllib3HTTPError, RpcError) as e:
                     logger.warning(e)
                     self.unit.status = ops.MaintenanceStatus(
                         "Client not responding to HTTP (attempt {}/{})".format(i + 1, connection_attempts))
@@ -211,7 +211,7 @@ class PolkadotCharm(ops.CharmBase):
 
     def _on_get_session_key_action(self, event: ops.ActionEvent) -> None:
         event.log("Getting new session key through RPC...")
-        rpc_port = ServiceArgs(self.config, self.rpc_urls()).rpc_port
+        rpc_port = ServiceArgs.get(self.config, self.rpc_urls()).rpc_port
         key = PolkadotRpcWrapper(rpc_port).get_session_key()
         if key:
             event.set_results(results={'session-keys-merged': key})
@@ -230,22 +230,20 @@ class PolkadotCharm(ops.CharmBase):
 
     def _on_has_session_key_action(self, event: ops.ActionEvent) -> None:
         key = event.params['key']
-        keypattern = re.compile(r'^0x')
-        if not re.match(keypattern, key):
+        if not key.startswith('0x'):
             event.fail("Illegal key pattern, did your key start with 0x ?")
         else:
-            rpc_port = ServiceArgs(self.config, self.rpc_urls()).rpc_port
+            rpc_port = ServiceArgs.get(self.config, self.rpc_urls()).rpc_port
             has_session_key = PolkadotRpcWrapper(rpc_port).has_session_key(key)
             event.set_results(results={'has-key': has_session_key})
 
     def _on_insert_key_action(self, event: ops.ActionEvent) -> None:
         mnemonic = event.params['mnemonic']
         address = event.params['address']
-        keypattern = re.compile(r'^0x')
-        if not re.match(keypattern, address):
+        if not address.startswith('0x'):
             event.fail("Illegal key pattern, did your public key/address start with 0x ?")
         else:
-            rpc_port = ServiceArgs(self.config, self.rpc_urls()).rpc_port
+            rpc_port = ServiceArgs.get(self.config, self.rpc_urls()).rpc_port
             PolkadotRpcWrapper(rpc_port).insert_key(mnemonic, address)
 
     def _on_restart_node_service_action(self, event: ops.ActionEvent) -> None:
@@ -278,7 +276,7 @@ class PolkadotCharm(ops.CharmBase):
 
     def _on_find_validator_address_action(self, event: ops.ActionEvent) -> None:
         event.log("Checking sessions key through RPC...")
-        rpc_port = ServiceArgs(self.config, self.rpc_urls()).rpc_port
+        rpc_port = ServiceArgs.get(self.config, self.rpc_urls()).rpc_port
         result = PolkadotRpcWrapper(rpc_port).is_validating_this_era()
         if result:
             event.set_results(results={'message': f'This node is currently validating for address {result["validator"]}'})
@@ -289,7 +287,7 @@ class PolkadotCharm(ops.CharmBase):
     def _on_is_validating_next_era_action(self, event: ops.ActionEvent) -> None:
         validator_address = event.params['address']
         event.log("Checking sessions key through RPC...")
-        rpc_port = ServiceArgs(self.config, self.rpc_urls()).rpc_port
+        rpc_port = ServiceArgs.get(self.config, self.rpc_urls()).rpc_port
         session_key = PolkadotRpcWrapper(rpc_port).is_validating_next_era(validator_address)
         if session_key:
             event.set_results(results={'message': f'This node will be validating next era for address {validator_address}'})
@@ -312,7 +310,7 @@ class PolkadotCharm(ops.CharmBase):
         # Client
         event.set_results(results={'client-service-args': utils.get_service_args()})
         event.set_results(results={'client-binary-version': utils.get_binary_version()})
-        event.set_results(results={'client-binary-md5sum': utils.get_binary_md5sum()})
+        event.set_results(results={'client-binary-md5sum': utils.get_binary_md5sum(self._stored.binary_md5sum)})
         event.set_results(results={'client-binary-last-changed': utils.get_binary_last_changed()})
         event.set_results(results={'client-wasm-files': utils.get_wasm_info()})
         proc_cmdline = utils.get_polkadot_proc_cmdline()
@@ -328,20 +326,18 @@ class PolkadotCharm(ops.CharmBase):
             event.set_results(results={'node-relay': utils.get_relay_for_parachain()})
         # On-chain info
         try:
-            rpc_port = ServiceArgs(self.config, self.rpc_urls()).rpc_port
+            rpc_port = ServiceArgs.get(self.config, self.rpc_urls()).rpc_port
             block_height = PolkadotRpcWrapper(rpc_port).get_block_height()
             if block_height:
                 event.set_results(results={'chain-block-height': block_height})
-            peer_list, success = PolkadotRpcWrapper(rpc_port).get_system_peers()
-            if peer_list and success:
-                event.set_results(results={'chain-peer-count': len(peer_list)})
-            elif peer_list and 'RPC call is unsafe' in peer_list[0]:
-                event.set_results(results={'chain-peer-count': 'RPC method error, check if the node has `--rpc-methods unsafe` enabled'})
-            else:
-                event.set_results(results={'chain-peer-count': 'Error trying to get peer count'})
-        except (RequestsConnectionError, NewConnectionError, MaxRetryError) as e:
+            peer_count = PolkadotRpcWrapper(rpc_port).get_peer_count()
+            event.set_results(results={'chain-peer-count': peer_count})
+        except (RequestsConnectionError, Urllib3HTTPError) as e:
             logger.warning(e)
             event.set_results(results={'on-chain-info': 'Unable to establish HTTP connection to client'})
+        except RpcError as e:
+            logger.warning(e)
+            event.set_results(results={'on-chain-info': f'Client answered with an error: {e}'})
 
     def _on_get_node_help_action(self, event: ops.ActionEvent) -> None:
         event.set_results(results={'help-output': utils.get_client_binary_help_output()})
@@ -21,3 +21,5 @@ NODE_KEY_FILE = Path(HOME_DIR, 'node-key')
 DB_CHAIN_DIR = Path(HOME_DIR, '.local/share/polkadot/chains')
 DB_RELAY_DIR = Path(HOME_DIR, '.local/share/polkadot/polkadot')
 WASM_DIR = Path(HOME_DIR, 'wasm')
+ENV_FILE = Path('/etc/default', USER)
+SERVICE_FILE = Path('/etc/systemd/system', f'{USER}.service')
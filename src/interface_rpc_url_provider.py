@@ -28,7 +28,7 @@ class RpcUrlProvider(Object):
     def _on_relation_joined(self, event: RelationJoinedEvent) -> None:
         """This event is used to broadcast the rpc url to the parachain clients."""
 
-        service_args_obj = ServiceArgs(self._charm.config, "")
+        service_args_obj = ServiceArgs.get(self._charm.config, "")
 
         ws_port = service_args_obj.ws_port
         rpc_port = service_args_obj.rpc_port
@@ -33,7 +33,7 @@ class RpcUrlRequirer(Object):
         """
         Update service args in response to a change in the relation data.
         """
-        argument_string = ServiceArgs(self._charm.config, self._charm.rpc_urls()).service_args_string
+        argument_string = ServiceArgs.get(self._charm.config, self._charm.rpc_urls()).service_args_string
         if utils.arguments_differ_from_disk(argument_string):
             utils.update_service_args(argument_string)
         self._charm.update_status()
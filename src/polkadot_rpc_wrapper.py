@@ -1,25 +1,118 @@
 #!/usr/bin/env python3
 
-import requests
+import urllib3
 import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Tuple
 from substrateinterface import SubstrateInterface
 
+# Results of slowly changing RPC calls, shared between wrapper instances since the charm creates a new one per call.
+# Maps (server address, method name) -> (monotonic timestamp, result).
+_RESULT_CACHE = {}
+# SubstrateInterface per server address, shared between wrapper instances for the same reason.
+_SUBSTRATE_INTERFACES = {}
+# Version number in the version string reported by the node.
+_VERSION_PATTERN = re.compile(r'([\d.]+)')
+
+
+class RpcError(Exception):
+    """Raised when the node answers a JSON-RPC call with an error instead of a result."""
+
+
 class PolkadotRpcWrapper():
 
-    def __init__(self, port):
+    def __init__(self, port, version_ttl: float = 300, syncing_ttl: float = 1):
+        """
+        :param port: the RPC port of the node
+        :param version_ttl: seconds to reuse a result from get_version()
+        :param syncing_ttl: seconds to reuse a result from is_syncing() and get_peer_count()
+        """
         self.__server_address = f'http://localhost:{port}'
-        self.__headers = {'Content-Type': 'application/json'}
+        # A bare urllib3 pool, since the per-request overhead of requests is larger than a localhost RPC itself.
+        # The node answers uncompressed, so ask for that explicitly and keep enough pooled connections for the
+        # concurrent session key checks. Connection errors are raised as urllib3 exceptions without retrying.
+        self.__http = urllib3.PoolManager(num_pools=1, maxsize=16, retries=False,
+                                          headers={'Content-Type': 'application/json', 'Accept-Encoding': 'identity'})
+        self.__version_ttl = version_ttl
+        self.__syncing_ttl = syncing_ttl
+
+    def __cached(self, name: str, ttl: float, fetch):
+        """Return the result of 'fetch' cached under 'name' if it is younger than 'ttl' seconds, else call it again."""
+        key = (self.__server_address, name)
+        now = time.monotonic()
+        if key in _RESULT_CACHE:
+            timestamp, result = _RESULT_CACHE[key]
+            if now - timestamp < ttl:
+                return result
+        result = fetch()
+        _RESULT_CACHE[key] = (now, result)
+        return result
+
+    def __substrate_interface(self) -> SubstrateInterface:
+        """
+        Get the SubstrateInterface for this node, creating it on first use.
+        The interface caches the runtime metadata it loads, so sharing it between wrappers avoids decoding the metadata again for every storage query.
+        """
+        if self.__server_address not in _SUBSTRATE_INTERFACES:
+            _SUBSTRATE_INTERFACES[self.__server_address] = SubstrateInterface(url=self.__server_address)
+        return _SUBSTRATE_INTERFACES[self.__server_address]
+
+    @staticmethod
+    def __concatenate_keys(keys: dict) -> str:
+        """
+        Some chains uses multiple keys. Before checking if it exist on the node they need to be concatenated removing preceding '0x'.
+        Joined in one pass to avoid building an intermediate string per key.
+        """
+        return '0x' + ''.join(k[2:] for k in keys.values())
+
+    def __rpc(self, method: str, params: list = None) -> dict:
+        """
+        Call the JSON-RPC 'method' on the node and return the decoded response.
+        The raw response bytes are parsed directly without decoding them to text first.
+        """
+        data = json.dumps({"id": 1, "jsonrpc": "2.0", "method": method, "params": params or []})
+        response = self.__http.request('POST', self.__server_address, body=data)
+        return json.loads(response.data)
+
+    def __rpc_batch(self, methods: list) -> list:
+        """
+        Call several parameterless JSON-RPC methods in one batch request and return their results in the same order.
+        The node may answer a batch in any order, so the responses are matched by id.
+        """
+        data = json.dumps([{"id": i, "jsonrpc": "2.0", "method": method, "params": []} for i, method in enumerate(methods)])
+        response = self.__http.request('POST', self.__server_address, body=data)
+        results = {r['id']: self.__result(r) for r in json.loads(response.data)}
+        return [results[i] for i in range(len(methods))]
+
+    @staticmethod
+    def __result(response_json: dict):
+        """Get the result of a JSON-RPC response, raising RpcError if the node answered with an error."""
+        if 'result' not in response_json:
+            raise RpcError(response_json.get('error', {}).get('message', 'No result in response'))
+        return response_json['result']
+
+    @staticmethod
+    def __parse_version(version: str) -> str:
+        return _VERSION_PATTERN.search(version).group(1)
+
+    def poll_status(self) -> dict:
+        """
+        Gets the syncing state, block height and version of the node in a single batched request.
+        Prefer this over calling is_syncing(), get_block_height() and get_version() one by one.
+        (E.g. poll_status() -> {'syncing': False, 'height': 19234567, 'version': '1.5.0'})
+        :return: dict
+        """
+        health, header, version = self.__rpc_batch(['system_health', 'chain_getHeader', 'system_version'])
+        return {'syncing': health['isSyncing'], 'height': int(header['number'], 16), 'version': self.__parse_version(version)}
 
     def get_session_key(self):
         """
         Get a new session key from node. (E.g. get_session_key() -> '0xb75f94a5eec...')
         :return: boolean
         """
-        data = '{"id":1, "jsonrpc":"2.0", "method": "author_rotateKeys", "params": []}'
-        response = requests.post(url=self.__server_address, headers=self.__headers, data=data)
-        response_json = json.loads(response.text)
+        response_json = self.__rpc('author_rotateKeys')
         return response_json['result']
 
     def is_syncing(self) -> str:
@@ -27,47 +120,55 @@ class PolkadotRpcWrapper():
         Checks if polkadot service is still syncing.
         Should return False when node is done syncing and ready to use as a validator.
         (E.g. is_syncing() -> True)
+        Prefer poll_status() when the block height or version is needed as well.
         :return: boolean
         """
-        data = '{"id":1, "jsonrpc":"2.0", "method": "system_health", "params": []}'
-        response = requests.post(url=self.__server_address, headers=self.__headers, data=data)
-        response_json = json.loads(response.text)
-        return response_json['result']['isSyncing']
+        return self.__system_health()['isSyncing']
+
+    def get_peer_count(self) -> int:
+        """
+        Gets the number of currently connected peers for this node.
+        Unlike get_system_peers() this only reads the count from `system_health`, so the peer list is never
+        transferred or parsed and the node does not need `--rpc-methods unsafe`.
+        :return: int
+        """
+        return self.__system_health()['peers']
+
+    def __system_health(self) -> dict:
+        return self.__cached('system_health', self.__syncing_ttl, lambda: self.__result(self.__rpc('system_health')))
 
     def get_version(self) -> str:
         """
         Checks which version polkadot service is running (E.g. get_version() -> '0.9.3')
+        Prefer poll_status() when the syncing state or block height is needed as well.
         :return: string
         """
-        data = '{"id":1, "jsonrpc":"2.0", "method": "system_version", "params": []}'
-        response = requests.post(url=self.__server_address, headers=self.__headers, data=data, timeout=None)
-        response_json = json.loads(response.text)
-        result = response_json['result']
-        version_number = re.search(r'([\d.]+)', result).group(1)
-        return version_number
+        return self.__cached('get_version', self.__version_ttl, self.__get_version)
+
+    def __get_version(self) -> str:
+        response_json = self.__rpc('system_version')
+        return self.__parse_version(response_json['result'])
 
     def get_block_height(self) -> int:
         """
         Checks the current block height of this node.
-        :return: string
+        Prefer poll_status() when the syncing state or version is needed as well.
+        :return: int
         """
-        data = '{"id": 1, "jsonrpc": "2.0", "method": "chain_getHeader", "params": []}'
-        response = requests.post(url=self.__server_address, headers=self.__headers, data=data, timeout=None)
-        response_json = json.loads(response.text)
+        response_json = self.__rpc('chain_getHeader')
         block_height = int(response_json['result']['number'], 16)
         return block_height
 
     def get_system_peers(self) -> Tuple[list, bool]:
         """
         Gets the list of currently connected peers for this node.
+        Use get_peer_count() if only the number of peers is needed.
 
         NOTE! Requires that the node has `--rpc-methods unsafe` enabled.
 
         :return: Tuple[list, bool]
         """
-        data = '{"id": 1, "jsonrpc": "2.0", "method": "system_peers", "params": []}'
-        response = requests.post(url=self.__server_address, headers=self.__headers, data=data, timeout=None)
-        response_json = json.loads(response.text)
+        response_json = self.__rpc('system_peers')
         if 'error' in response_json.keys():
             return [response_json['error']['message']], False
         peer_list = response_json['result']
@@ -79,9 +180,7 @@ class PolkadotRpcWrapper():
         :param session_key: string
         :return: boolean
         """
-        data = '{"id": 1, "jsonrpc":"2.0", "method": "author_hasSessionKeys", "params":["' + session_key + '"]}'
-        response = requests.post(url=self.__server_address, headers=self.__headers, data=data)
-        response_json = json.loads(response.text)
+        response_json = self.__rpc('author_hasSessionKeys', [session_key])
         result = response_json['result']
         return result
 
@@ -92,8 +191,7 @@ class PolkadotRpcWrapper():
         :param address: string
         :return: boolean
         """
-        data = '{"id": 1,"jsonrpc":"2.0", "method": "author_insertKey", "params":["aura","' + mnemonic + '","' + address + '"]}'
-        requests.post(url=self.__server_address, headers=self.__headers, data=data)
+        self.__rpc('author_insertKey', ['aura', mnemonic, address])
 
     def is_validating_this_era(self):
         """
@@ -101,16 +199,23 @@ class PolkadotRpcWrapper():
         It does so by checking if any session key currently on-chain is present on this node.
         :return: the validator/collator address or False.
         """
-        substrate = SubstrateInterface(url=self.__server_address)
+        substrate = self.__substrate_interface()
         result = substrate.query("Session", "QueuedKeys").value_serialized
-        for validator in result:
-            keys = validator[1]
-            session_key = '0x'
-            for k in keys.values():
-                # Some chains uses multiple keys. Before checking if it exist on the node they need to be concatenated removing preceding '0x'.
-                session_key += k[2:]
-            if self.has_session_key(session_key):
-                return {"validator": validator[0], "session_key": session_key}
+        # Overlap the round trips of checking many session keys against the node. The pool is shut down when the
+        # check is done, after the checks that already started have finished.
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            futures = {}
+            for validator in result:
+                session_key = self.__concatenate_keys(validator[1])
+                futures[pool.submit(self.has_session_key, session_key)] = (validator[0], session_key)
+            try:
+                for future in as_completed(futures):
+                    if future.result():
+                        validator, session_key = futures[future]
+                        return {"validator": validator, "session_key": session_key}
+            finally:
+                for future in futures:
+                    future.cancel()
         return False
 
     def is_validating_next_era(self, address):
@@ -120,12 +225,10 @@ class PolkadotRpcWrapper():
         And if that session key exist on this node.
         :return: the session key if found on this node, else False.
         """
-        substrate = SubstrateInterface(url=self.__server_address)
+        substrate = self.__substrate_interface()
         result = substrate.query("Session", "NextKeys", [address]).value_serialized
         if result:
-            session_key = '0x'
-            for k in result.values():
-                session_key += k[2:]
+            session_key = self.__concatenate_keys(result)
             if self.has_session_key(session_key):
                 return session_key
         return False
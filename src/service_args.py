@@ -1,15 +1,47 @@
 #!/usr/bin/env python3
 
+import functools
 import constants as c
 import utils
-from pathlib import Path
-from os.path import exists
-import re
+from concurrent.futures import ThreadPoolExecutor
 from ops.model import ConfigData
 
 
+@functools.lru_cache(maxsize=None)
+def _spec_path(filename: str) -> str:
+    """Get the path of a chain spec file as it is passed to '--chain'."""
+    return f'{c.CHAIN_SPEC_DIR}/{filename}'
+
+
+def _download_chain_specs(chain_specs: list) -> None:
+    """Download the (url, filename) chain specs that are not already on disk, concurrently since they are independent."""
+    missing = [(url, filename) for url, filename in chain_specs if not utils.chain_spec_downloaded(url, filename)]
+    if not missing:
+        return
+    with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+        # Consume the results so that any download error is raised here.
+        list(executor.map(lambda chain_spec: utils.download_chain_spec(*chain_spec), missing))
+
+
+# ServiceArgs objects built during this hook, keyed by the config values and relay rpc urls they were built from.
+_CACHE = {}
+
+
 class ServiceArgs():
 
+    @classmethod
+    def get(cls, config: ConfigData, relay_rpc_urls: list) -> 'ServiceArgs':
+        """Get the ServiceArgs for the given config and relay rpc urls, reusing an earlier object built from the same values."""
+        key = (config.get('service-args'),
+               config.get('chain-spec-url'),
+               config.get('local-relaychain-spec-url'),
+               config.get('wasm-runtime-url'),
+               tuple(relay_rpc_urls))
+        service_args = _CACHE.get(key)
+        if service_args is None:
+            service_args = _CACHE[key] = cls(config, relay_rpc_urls)
+        return service_args
+
     def __init__(self, config: ConfigData, relay_rpc_urls: dict):
         service_args = self.__encode_for_emoji(config.get('service-args'))
         self._relay_rpc_urls = relay_rpc_urls
@@ -18,49 +50,54 @@ class ServiceArgs():
         self._runtime_wasm_override = True if config.get('wasm-runtime-url') else False
         self.__check_service_args(service_args)
         self.service_args_list = self.__service_args_to_list(service_args)
-        self.__check_service_args(self.service_args_list)
-        # Service args that is modified to use for the service.
-        self.service_args_list_customized = self.service_args_list
+        self._positions = self.__index_args(self.service_args_list)
+        # The index doubles as a hashed set of the arguments, so this check is done with O(1) lookups.
+        self.__check_service_args(self._positions)
+        # The parsed service args never change, so the chain name is only looked up once.
+        self._chain_name = self.__get_arg_value('--chain')
+        # Service args that is modified to use for the service. Only values are replaced in it, so it shares the index of the parsed args.
+        self.service_args_list_customized = list(self.service_args_list)
+        # Args added before and after the configured service args when customizing them.
+        self._prefix_args = []
+        self._suffix_args = []
         self.__customize_service_args()
-
-    @property
-    def service_args_string(self) -> list:
-        """Get the modified service args as string. This is what should be used for the service."""
-        return ' '.join(str(x) for x in self.service_args_list_customized)
+        # The modified service args as string. This is what should be used for the service.
+        self.service_args_string = ' '.join(self._prefix_args + self.service_args_list_customized + self._suffix_args)
 
     @property
     def chain_name(self) -> str:
         """Get the value of '--chain' current set in the service-args config parameter."""
-        try:
-            i = self.service_args_list.index('--chain')
-            return self.service_args_list[i + 1]
-        except ValueError:
-            return ''
+        return self._chain_name
 
     @property
     def is_validator(self) -> bool:
         """Check if the node is running as a validator or collator."""
-        return '--validator' in self.service_args_list or '--collator' in self.service_args_list
+        return '--validator' in self._positions or '--collator' in self._positions
 
     @property
     def rpc_port(self) -> str:
         """Get the value of '--rpc-port' current set in the service-args config parameter."""
-        try:
-            i = self.service_args_list.index('--rpc-port')
-            return self.service_args_list[i + 1]
-        except ValueError:
-            return ''
+        return self.__get_arg_value('--rpc-port')
 
     @property
     def ws_port(self) -> str:
         """Get the value of '--ws-port' current set in the service-args config parameter."""
-        try:
-            i = self.service_args_list.index('--ws-port')
-            return self.service_args_list[i + 1]
-        except ValueError:
-            return ''
-
-    def __check_service_args(self, service_args: str or list):
+        return self.__get_arg_value('--ws-port')
+
+    def __get_arg_value(self, key: str) -> str:
+        """Get the value following the first occurrence of 'key' in the service-args config parameter."""
+        positions = self._positions.get(key)
+        return self.service_args_list[positions[0] + 1] if positions else ''
+
+    @staticmethod
+    def __index_args(args: list) -> dict:
+        """Map each argument to the positions where it occurs in 'args'."""
+        positions = {}
+        for i, arg in enumerate(args):
+            positions.setdefault(arg, []).append(i)
+        return positions
+
+    def __check_service_args(self, service_args: str or dict):
         msg = ""
         # Check for service arguments that must be set.
         if "--chain" not in service_args:
@@ -77,38 +114,46 @@ class ServiceArgs():
         if msg:
             raise ValueError(msg)
 
-    def __service_args_to_list(self, service_args: str) -> list:
-        # Split on any number of spaces and '='. Hence, this will support both '--key value' and '--key=value' in the config.
-        service_args = re.split(' +|=', service_args)
-        return service_args
+    def __service_args_to_list(self, service_args: str) -> tuple:
+        # Split on any whitespace and '='. Hence, this will support both '--key value' and '--key=value' in the config.
+        # Frozen as a tuple since the parsed service args are never modified, only the customized copy is.
+        return tuple(service_args.replace('=', ' ').split())
 
     def __encode_for_emoji(self, text):
+        # Plain ASCII without escape sequences comes out of the transcoding unchanged, so skip it.
+        if text.isascii() and '\\u' not in text and '\\U' not in text:
+            return text
         # encoding to support emoji codes, typically used in '--name'.
         text = text.encode('latin_1').decode("raw_unicode_escape").encode('utf-16', 'surrogatepass').decode('utf-16')
         return text
 
     def __set_chain_name(self, value: str, position: int):
-        try:
-            # Try to change the value of '--chain' if it already exists in the service args.
-            # Position 0 would be the first occurrence, 1 the second.
-            chain_key_index = [i for i, n in enumerate(self.service_args_list_customized) if n == '--chain'][position]
-            self.service_args_list_customized[chain_key_index + 1] = value
-        except IndexError:
-            # If '--chain' does not exist for the given position, add it.
-            if position == 0:
-                self.__add_firstchain_args(['--chain', value])
-            elif position == 1:
-                self.__add_secondchain_args(['--chain', value])
+        # Position 0 would be the first occurrence of '--chain', 1 the second.
+        occurrence = position
+        for args, chain_key_indexes in ((self._prefix_args, [i for i, arg in enumerate(self._prefix_args) if arg == '--chain']),
+                                        (self.service_args_list_customized, self._positions.get('--chain', [])),
+                                        (self._suffix_args, [i for i, arg in enumerate(self._suffix_args) if arg == '--chain'])):
+            if occurrence < len(chain_key_indexes):
+                # Change the value of '--chain' if it already exists in the service args.
+                args[chain_key_indexes[occurrence] + 1] = str(value)
+                return
+            occurrence -= len(chain_key_indexes)
+        # If '--chain' does not exist for the given position, add it.
+        if position == 0:
+            self.__add_firstchain_args(['--chain', value])
+        elif position == 1:
+            self.__add_secondchain_args(['--chain', value])
 
     def __add_firstchain_args(self, args: list):
         """First part (to the left of --) in service args. Typically the parachain part for parachains."""
-        self.service_args_list_customized = args + self.service_args_list_customized
+        # Args are stored as strings so that they can be joined directly.
+        self._prefix_args[:0] = map(str, args)
 
     def __add_secondchain_args(self, args: list):
         """Second part (to the right of --) in service args. Typically the relay chain for parachains."""
-        if '--' not in self.service_args_list_customized:
-            self.service_args_list_customized = self.service_args_list_customized + ['--']
-        self.service_args_list_customized = self.service_args_list_customized + args
+        if '--' not in self._positions and '--' not in self._suffix_args:
+            self._suffix_args.append('--')
+        self._suffix_args.extend(map(str, args))
 
     def __customize_service_args(self):
         self.__add_firstchain_args(['--node-key-file', c.NODE_KEY_FILE])
@@ -116,35 +161,46 @@ class ServiceArgs():
             self.__add_firstchain_args(['--relay-chain-rpc-urls', *self._relay_rpc_urls])
 
         # All hardcoded --chain overrides in the functions below are deprecated and the values should be set in the new chain-spec configs instead.
-        if self.chain_name.startswith('aleph-zero'):
-            self.__aleph_zero()
-        elif self.chain_name in ['crust-mainnet', 'crust-maxwell', 'crust-rocky']:
-            self.__crust()
-        elif self.chain_name.startswith('sora'):
-            self.__sora()
+        handler = self.__get_chain_handler()
+        if handler:
+            handler(self)
 
         # The chain spec configs should be applied after hardcoded chain customizations above since this should override any hardcoded --chain overrides.
+        chain_specs = []
         if self._chain_spec_url:
-            utils.download_chain_spec(self._chain_spec_url, 'chain-spec.json')
-            self.__set_chain_name(f'{c.CHAIN_SPEC_DIR}/chain-spec.json', 0)
+            chain_specs.append((self._chain_spec_url, 'chain-spec.json'))
         if self._local_relaychain_spec_url:
-            utils.download_chain_spec(self._local_relaychain_spec_url, 'relaychain-spec.json')
-            self.__set_chain_name(f'{c.CHAIN_SPEC_DIR}/relaychain-spec.json', 1)
+            chain_specs.append((self._local_relaychain_spec_url, 'relaychain-spec.json'))
+        _download_chain_specs(chain_specs)
+        if self._chain_spec_url:
+            self.__set_chain_name(_spec_path('chain-spec.json'), 0)
+        if self._local_relaychain_spec_url:
+            self.__set_chain_name(_spec_path('relaychain-spec.json'), 1)
         if self._runtime_wasm_override:
             self.__add_firstchain_args(['--wasm-runtime-overrides', c.WASM_DIR])
 
+    def __get_chain_handler(self):
+        """Get the hardcoded customization for the chain, matching on the exact chain name first and on its prefix second."""
+        handler = self._CHAIN_HANDLERS.get(self._chain_name)
+        # Most chains have no customization, which a single startswith on all prefixes rules out.
+        if handler is None and self._chain_name.startswith(self._CHAIN_PREFIXES):
+            for prefix, prefix_handler in self._CHAIN_PREFIX_HANDLERS:
+                if self._chain_name.startswith(prefix):
+                    return prefix_handler
+        return handler
+
     def __aleph_zero(self):
-        if self.chain_name.endswith('testnet'):
+        if self._chain_name.endswith('testnet'):
             self.__set_chain_name('testnet', 0)
-        elif self.chain_name.endswith('mainnet'):
+        elif self._chain_name.endswith('mainnet'):
             self.__set_chain_name('mainnet', 0)
 
     def __crust(self):
-        if self.chain_name == 'crust-mainnet':
+        if self._chain_name == 'crust-mainnet':
             self.__set_chain_name('mainnet', 0)
-        elif self.chain_name == 'crust-maxwell':
+        elif self._chain_name == 'crust-maxwell':
             self.__set_chain_name('maxwell', 0)
-        elif self.chain_name == 'crust-rocky':
+        elif self._chain_name == 'crust-rocky':
             self.__set_chain_name('rocky', 0)
 
     def __sora(self):
@@ -154,5 +210,17 @@ class ServiceArgs():
         --chain=sora-main -> --chain=main
         --chain=sora-another-network -> --chain=another-network
         '''
-        chain_name = self.chain_name.split('-', 1)[1]
+        chain_name = self._chain_name.split('-', 1)[1]
         self.__set_chain_name(chain_name, 0)
+
+    # Deprecated hardcoded chain customizations, see __customize_service_args.
+    _CHAIN_HANDLERS = {
+        'crust-mainnet': __crust,
+        'crust-maxwell': __crust,
+        'crust-rocky': __crust,
+    }
+    _CHAIN_PREFIX_HANDLERS = (
+        ('aleph-zero', __aleph_zero),
+        ('sora', __sora),
+    )
+    _CHAIN_PREFIXES = tuple(prefix for prefix, _ in _CHAIN_PREFIX_HANDLERS)
@@ -1,4 +1,5 @@
-import subprocess as sp
+import os
+import shutil
 from tarfile import open as open_tarfile
 
 import constants as c
@@ -10,19 +11,29 @@ class Tarball:
         self.tarball_path = tarball_path
 
     def extract_resources_from_tarball(self):
-        tarball = open_tarfile(self.tarball_path, mode='r')
-
         if self.chain_name == 'goldberg':  # Avail
-            if 'data-avail' in tarball.getnames():
-                member = tarball.getmember('data-avail')
-                if member.isfile():
-                    tarball.extract(member, path=c.HOME_DIR)
-                    sp.run(['mv', c.HOME_DIR/'data-avail', c.BINARY_FILE, '--force'])
-                    sp.run(['rm', self.tarball_path])
-                    sp.run(['chown', f'{c.USER}:{c.USER}', c.BINARY_FILE])
-                else:
-                    raise ValueError("Expected client binary 'data-avail' in tarball is not a file.")
-            else:
-                raise ValueError("Expected client binary 'data-avail' not found in tarball!")
+            # Copy the binary straight next to its destination instead of extracting it to the home dir and moving it.
+            binary_file_new = c.BINARY_FILE.with_suffix('.new')
+            try:
+                # Read the tarball as a stream, member by member, instead of indexing all members up front.
+                # Use a larger block size than the default 10 KiB to cut down on reads of large tarballs.
+                with open_tarfile(self.tarball_path, mode='r|*', bufsize=1 << 20) as tarball:
+                    for member in tarball:
+                        if member.name == 'data-avail':
+                            if not member.isfile():
+                                raise ValueError("Expected client binary 'data-avail' in tarball is not a file.")
+                            with tarball.extractfile(member) as src, open(binary_file_new, 'wb') as dst:
+                                shutil.copyfileobj(src, dst, 1 << 20)
+                            break
+                    else:
+                        raise ValueError("Expected client binary 'data-avail' not found in tarball!")
+                os.chmod(binary_file_new, member.mode)
+                shutil.chown(binary_file_new, c.USER, c.USER)
+            except BaseException:
+                # Don't leave a partially copied binary behind in the home dir.
+                binary_file_new.unlink(missing_ok=True)
+                raise
+            os.replace(binary_file_new, c.BINARY_FILE)
+            os.unlink(self.tarball_path)
         else:
             raise ValueError(f'Could not extract tarball since {self.chain_name} lacks a tarball handler!')
@@ -1,59 +1,113 @@
 #!/usr/bin/env python3
 
-import glob
 import tempfile
 import requests
 import subprocess as sp
 import shutil
 import sys
 import os
+import pwd
+import grp
 import hashlib
 import time
 import logging
 import re
 import json
+import functools
+import math
+import tarfile
+import threading
 import constants as c
+from datetime import datetime
+from itertools import zip_longest
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from ops.model import ConfigData
-from docker import Docker
 from tarball import Tarball
 from tarfile import open as open_tarfile
 
 
 logger = logging.getLogger(__name__)
 
+BINARY_DOWNLOAD_ERROR = "Download binary failed with: {}. Check 'binary-url'!"
+# Seconds to wait for a connection to a server and then between each read from it, so that a stalled server can't hang a hook.
+REQUEST_TIMEOUT = (10, 60)
+# Largest file that is downloaded. Anything larger is assumed to be an error page or a wrong url.
+MAX_DOWNLOAD_SIZE = 8 * 1024 * 1024 * 1024
+# Bytes of the body of a failed download that are shown in the error message.
+ERROR_TEXT_SIZE = 4096
+# Files at least this large are downloaded in parallel byte ranges when the server supports it.
+RANGED_DOWNLOAD_MIN_SIZE = 64 * 1024 * 1024
+RANGED_DOWNLOAD_PARTS = 8
+# Limits the byte ranges downloaded at the same time across all downloads, so that concurrent ranged downloads stay
+# within the connections the session keeps per host.
+_RANGE_SLOTS = threading.BoundedSemaphore(RANGED_DOWNLOAD_PARTS)
+# Times that an interrupted download is resumed from where it stopped, when the server supports byte ranges.
+DOWNLOAD_RESUMES = 3
+# Errors raised by requests when a connection drops in the middle of a download.
+_INTERRUPTED_DOWNLOAD_ERRORS = (requests.ConnectionError, requests.exceptions.ChunkedEncodingError)
+# Largest chain spec that is accepted. Raw chain specs with a full genesis state can be hundreds of MiB.
+MAX_CHAIN_SPEC_SIZE = 1024 * 1024 * 1024
+# Seconds that a computed disk usage is reused, since walking a chain database is expensive.
+DISK_USAGE_TTL = 10
+_DISK_USAGE_CACHE = {}
+# Version number in the output of the client binary's '--version' flag.
+_VERSION_PATTERN = re.compile(rb'([\d.]+)')
+
+
+def _create_session() -> requests.Session:
+    """Create the HTTP session shared by all downloads, reusing connections and retrying on transient server errors."""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_SESSION = _create_session()
+
 
 def install_docker() -> None:
-    try:
-        sp.check_call(["docker", "--version"])
-    except FileNotFoundError:
+    # Look docker up on PATH rather than running the cli, which is slow to start.
+    if shutil.which('docker') is None:
         sp.run(['curl', '-fsSL', 'https://get.docker.com', '-o', 'get-docker.sh'], check=False)
         sp.run(['sh', 'get-docker.sh'], check=False)
         sp.run(['usermod', '-aG', 'docker', c.USER], check=False)
 
 
 def install_binary(config: ConfigData, chain_name: str) -> None:
-    if config.get('binary-url') and config.get('docker-tag'):
+    binary_url = config.get('binary-url')
+    docker_tag = config.get('docker-tag')
+    if binary_url and docker_tag:
         raise ValueError("Only one of 'binary-url' or 'docker-tag' can be set at the same time!")
-    if config.get('binary-url'):
-        if config.get('binary-url').endswith('.deb'):
-            install_deb_from_url(config.get('binary-url'))
-        elif config.get('binary-url').endswith('.tar.gz') or config.get('binary-url').endswith('.tgz'):
-            install_tarball_from_url(config.get('binary-url'), config.get('binary-sha256-url'), chain_name)
-        elif len(config.get('binary-url').split()) > 1:
-            install_binaries_from_urls(config.get('binary-url'), config.get('binary-sha256-url'), chain_name)
+    if binary_url:
+        binary_sha256_url = config.get('binary-sha256-url')
+        if binary_url.endswith('.deb'):
+            install_deb_from_url(binary_url)
+        elif binary_url.endswith(('.tar.gz', '.tgz')):
+            install_tarball_from_url(binary_url, binary_sha256_url, chain_name)
+        elif len(binary_url.split()) > 1:
+            install_binaries_from_urls(binary_url, binary_sha256_url, chain_name)
         else:
-            install_binary_from_url(config.get('binary-url'), config.get('binary-sha256-url'))
-    elif config.get('docker-tag'):
+            install_binary_from_url(binary_url, binary_sha256_url)
+    elif docker_tag:
+        # Imported here since docker imports utils, and only this branch needs it.
+        from docker import Docker
         install_docker()
-        Docker(chain_name, config.get('docker-tag')).extract_resources_from_docker()
+        Docker(chain_name, docker_tag).extract_resources_from_docker()
     else:
         raise ValueError("Either 'binary-url' or 'docker-tag' must be set!")
 
 
 def find_binary_installed_by_deb(package_name: str, ) -> str:
-    files = sp.check_output(['dpkg', '-L', package_name]).decode().split('\n')[:-1]
-    bin_files = [file for file in files if file.startswith('/bin/')]
+    with sp.Popen(['dpkg', '-L', package_name], stdout=sp.PIPE, encoding='utf-8') as process:
+        # Filter the listed files as they are read, instead of splitting the whole listing first
+        bin_files = [file.rstrip('\n') for file in process.stdout if file.startswith('/bin/')]
+    if process.returncode:
+        raise sp.CalledProcessError(process.returncode, process.args)
     logger.debug('Found files in /bin/ %s', str(bin_files))
     if len(bin_files) > 1:
         raise Exception(f'Found more than one file installed in /bin/ by package {package_name}. Cannot be sure which one to use.')
@@ -61,10 +115,8 @@ def find_binary_installed_by_deb(package_name: str, ) -> str:
 
 
 def install_deb_from_url(url: str) -> None:
-    deb_response = requests.get(url, allow_redirects=True, timeout=None)
     deb_path = Path(c.HOME_DIR, url.split('/')[-1])
-    with open(deb_path, 'wb') as f:
-        f.write(deb_response.content)
+    _download_stream(url, deb_path, BINARY_DOWNLOAD_ERROR)
     package_name = sp.check_output(['dpkg-deb', '-f', deb_path, 'Package']).decode('utf-8').strip()
     logger.debug('Installing package %s from deb file %s', package_name, str(deb_path))
     stop_service()
@@ -79,14 +131,9 @@ def install_deb_from_url(url: str) -> None:
 
 
 def install_tarball_from_url(url, sha256_url, chain_name):
-    tarball_response = requests.get(url, allow_redirects=True, timeout=None)
     tarball_path = Path(c.HOME_DIR, url.split('/')[-1])
-    if tarball_response.status_code != 200:
-        raise ValueError(f"Download binary failed with: {tarball_response.text}. Check 'binary-url'!")
-
     # TODO: Add sha256 checksum verification here in case some future chain provides them
-    with open(tarball_path, 'wb') as f:
-        f.write(tarball_response.content)
+    _download_stream(url, tarball_path, BINARY_DOWNLOAD_ERROR)
 
     stop_service()
     tarball = Tarball(tarball_path, chain_name)
@@ -95,83 +142,91 @@ def install_tarball_from_url(url, sha256_url, chain_name):
 
 
 def parse_install_urls(binary_urls: str, sha256_urls: str) -> list:
-    binary_url_list = binary_urls.split()
-    sha256_url_list = sha256_urls.split()
-    url_pairs = []
-    for i in range(max(len(binary_url_list), len(sha256_url_list))):
-        binary_url = binary_url_list[i] if i < len(binary_url_list) else ""
-        sha256_url = sha256_url_list[i] if i < len(sha256_url_list) else ""
-        url_pairs.append((binary_url, sha256_url))
-    return url_pairs
+    # Pair up the urls in order, padding the shorter list with empty strings
+    return list(zip_longest(binary_urls.split(), sha256_urls.split(), fillvalue=""))
 
 
 def install_binaries_from_urls(binary_urls: str, sha256_urls: str, chain_name: str) -> None:
     logger.debug('Installing multiple binaries!')
     binary_sha256_pairs = parse_install_urls(binary_urls, sha256_urls)
-    responses = []
+    binaries = []
     for binary_url, sha256_url in binary_sha256_pairs:
-        logger.debug("Download binary from URL: %s", binary_url)
-        # Download polkadot binary to memory and compute sha256 hash
-        response = requests.get(binary_url, allow_redirects=True, timeout=None)
-        if response.status_code != 200:
-            raise ValueError(f"Download binary failed with: {response.text}. Check 'binary-url'!")
-        binary_hash = hashlib.sha256(response.content).hexdigest()
+        basename = binary_url.rpartition('/')[2]
         # Get correct execute worker binary name
-        if 'execute-worker' in binary_url.split('/')[-1]:
-            if chain_name in c.EXECUTE_WORKER_BINARY_FILE:
-                binary_name = c.EXECUTE_WORKER_BINARY_FILE[chain_name]
-            else:
-                binary_name = c.EXECUTE_WORKER_BINARY_FILE['default']
+        if 'execute-worker' in basename:
+            binary_name = c.EXECUTE_WORKER_BINARY_FILE.get(chain_name, c.EXECUTE_WORKER_BINARY_FILE['default'])
         # Get correct prepare worker binary name
-        elif 'prepare-worker' in binary_url.split('/')[-1]:
-            if chain_name in c.PREPARE_WORKER_BINARY_FILE:
-                binary_name = c.PREPARE_WORKER_BINARY_FILE[chain_name]
-            else:
-                binary_name = c.PREPARE_WORKER_BINARY_FILE['default']
+        elif 'prepare-worker' in basename:
+            binary_name = c.PREPARE_WORKER_BINARY_FILE.get(chain_name, c.PREPARE_WORKER_BINARY_FILE['default'])
         else:
             binary_name = c.BINARY_FILE
-        responses += [(binary_url, sha256_url, response, binary_name, binary_hash)]
-    perform_sha256_checksums(responses, sha256_urls)
+        binaries += [(binary_url, sha256_url, c.HOME_DIR / binary_name, binary_name)]
+
+    def download_binary(binary: tuple) -> tuple:
+        binary_url, sha256_url, binary_path, binary_name = binary
+        logger.debug("Download binary from URL: %s", binary_url)
+        # Stream the binary to a temporary file next to the installed one and compute its sha256 hash on the way
+        binary_hash = _download_stream(binary_url, binary_path.with_suffix('.new'), BINARY_DOWNLOAD_ERROR, mode=0o755)
+        return binary_url, sha256_url, binary_path, binary_name, binary_hash
+
+    try:
+        sha256_url_set = set(sha256_urls.split())
+        # The downloads are independent, so run them concurrently while keeping their order.
+        with ThreadPoolExecutor(max_workers=min(8, len(binaries)) + len(sha256_url_set)) as executor:
+            # Fetch the small sha256 files alongside the binaries instead of after them
+            sha256_futures = {sha256_url: executor.submit(get_sha256_text, sha256_url) for sha256_url in sha256_url_set}
+            downloads = list(executor.map(download_binary, binaries))
+            sha256_texts = {sha256_url: future.result() for sha256_url, future in sha256_futures.items()}
+        perform_sha256_checksums(downloads, sha256_urls, sha256_texts)
+    except Exception:
+        for _, _, binary_path, _ in binaries:
+            binary_path.with_suffix('.new').unlink(missing_ok=True)
+        raise
     stop_service()
-    for binary_url, _, response, binary_name, _ in responses:
+    for binary_url, _, binary_path, _, _ in downloads:
         logger.debug("Unpack binary downloaded from: %s", binary_url)
-        binary_path = c.HOME_DIR / binary_name
-        with open(binary_path, 'wb') as f:
-            f.write(response.content)
-            sp.run(['chown', f'{c.USER}:{c.USER}', binary_path], check=False)
-            sp.run(['chmod', '+x', binary_path], check=False)
+        os.replace(binary_path.with_suffix('.new'), binary_path)
     start_service()
 
 
 def install_binary_from_url(url: str, sha256_url: str) -> None:
     logger.debug("Install binary from URL: %s", url)
-    # Download polkadot binary to memory and compute sha256 hash
-    binary_response = requests.get(url, allow_redirects=True, timeout=None)
-    if binary_response.status_code != 200:
-        raise ValueError(f"Download binary failed with: {binary_response.text}. Check 'binary-url'!")
+    target_hash = installed_hash = ''
     if sha256_url:
-        binary_hash = hashlib.sha256(binary_response.content).hexdigest()
-        perform_sha256_checksum(binary_hash, sha256_url)
+        # Hash the installed binary while the target hash is fetched, instead of after
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            target_future = executor.submit(get_sha256_target, sha256_url)
+            installed_future = executor.submit(_file_hash, c.BINARY_FILE) if c.BINARY_FILE.exists() else None
+            target_hash = target_future.result()
+            installed_hash = installed_future.result() if installed_future else ''
+    # Skip the download if the installed binary already is the one published at the url
+    if target_hash and installed_hash == target_hash:
+        logger.info("Binary from %s is already installed, skipping download", url)
+        start_service()
+        return
+    # Stream polkadot binary to a temporary file next to the installed one and compute sha256 hash on the way
+    binary_file_new = c.BINARY_FILE.with_suffix('.new')
+    binary_hash = _download_stream(url, binary_file_new, BINARY_DOWNLOAD_ERROR, mode=0o755)
+    # Raise error if hash is incorrect
+    if target_hash and binary_hash != target_hash:
+        binary_file_new.unlink()
+        raise ValueError("Binary downloaded has wrong hash!")
+    # The new binary is complete, owned by the user and synced to disk, so the service only needs to be down for the rename
     stop_service()
-    with open(c.BINARY_FILE, 'wb') as f:
-        f.write(binary_response.content)
-        sp.run(['chown', f'{c.USER}:{c.USER}', c.BINARY_FILE], check=False)
-        sp.run(['chmod', '+x', c.BINARY_FILE], check=False)
+    os.replace(binary_file_new, c.BINARY_FILE)
     start_service()
 
 
-def perform_sha256_checksums(responses: list, sha256_urls: str) -> None:
+def perform_sha256_checksums(responses: list, sha256_urls: str, sha256_texts: dict) -> None:
+    """Check the hashes of downloaded binaries, given the content of each sha256 file mapped by its url."""
     if len(sha256_urls.split()) == 1:
-        sha256_response = get_sha256_response(sha256_urls)
-        sha256_target_map = {}
-        for binary_hash_pair in sha256_response.text.split('\n'):
-            if binary_hash_pair:
-                binary_name = binary_hash_pair.split()[1]
-                sha256 = binary_hash_pair.split()[0]
-                sha256_target_map[binary_name] = sha256
+        sha256_text = sha256_texts[sha256_urls.split()[0]]
+        # Each line is a hash followed by a file name. Lines without both are skipped.
+        sha256_target_map = {parts[1]: parts[0] for line in sha256_text.splitlines() if len(parts := line.split(None, 2)) >= 2}
         for _, _, _, binary_name, binary_hash in responses:
             try:
-                target_hash = sha256_target_map[binary_name]
+                # The manifest lists file names, while binary_name is the path the binary is installed to
+                target_hash = sha256_target_map[Path(binary_name).name]
             except KeyError:
                 raise ValueError(f"Could not find target hash for {binary_name}. Was the correct sha256 URL provided?")
             # Raise error if hash is incorrect
@@ -180,39 +235,71 @@ def perform_sha256_checksums(responses: list, sha256_urls: str) -> None:
     else:
         for _, sha256_url, _, _, binary_hash in responses:
             if sha256_url:
-                perform_sha256_checksum(binary_hash, sha256_url)
+                perform_sha256_checksum(binary_hash, sha256_texts[sha256_url])
 
 
-def perform_sha256_checksum(binary_hash: str, sha256_url: str) -> None:
-    sha256_response = get_sha256_response(sha256_url)
-    data = sha256_response.text
-    target_hash = data.split(' ')[0]
+def perform_sha256_checksum(binary_hash: str, sha256_text: str) -> None:
+    target_hash = sha256_text.split(' ')[0]
     # Raise error if hash is incorrect
     if (binary_hash != target_hash):
         raise ValueError("Binary downloaded has wrong hash!")
 
 
-def get_sha256_response(sha256_url: str) -> requests.Response:
-    sha256_response = requests.get(sha256_url, allow_redirects=True, timeout=None)
-    if len(sha256_response.content) > 1024:  # 1 KB
-        raise ValueError("Sha256 file is larger than 1KB. Was the correct sha256 url provided?")
-    return sha256_response
+def get_sha256_target(sha256_url: str) -> str:
+    """Get the target sha256 hash from a sha256 file with a single hash, as output by 'sha256sum'."""
+    data = get_sha256_text(sha256_url)
+    return data.split(' ')[0]
+
+
+def get_sha256_text(sha256_url: str) -> str:
+    """Get the content of a sha256 file, stopping the download as soon as it turns out to be larger than 1KB."""
+    content = b''
+    with _SESSION.get(sha256_url, allow_redirects=True, stream=True, timeout=REQUEST_TIMEOUT) as sha256_response:
+        for chunk in sha256_response.iter_content(chunk_size=512):
+            content += chunk
+            if len(content) > 1024:  # 1 KB
+                raise ValueError("Sha256 file is larger than 1KB. Was the correct sha256 url provided?")
+    return content.decode('utf-8', errors='replace')
 
 
 def download_chain_spec(url: str, filename: Path) -> None:
     """Download a chain spec file from a given URL to a given filepath."""
-    if not c.CHAIN_SPEC_DIR.exists():
-        c.CHAIN_SPEC_DIR.mkdir(parents=True)
-    download_file(url, Path(c.CHAIN_SPEC_DIR, filename))
-    validate_file(Path(c.CHAIN_SPEC_DIR, filename), file_type='json')
+    # Chain specs may be downloaded concurrently, so tolerate the directory being created in between.
+    c.CHAIN_SPEC_DIR.mkdir(parents=True, exist_ok=True)
+    # Download next to the chain spec and only move it into place once it is valid, so that a failed download
+    # leaves the previous chain spec and the url it came from in step.
+    chain_spec_new = Path(c.CHAIN_SPEC_DIR, f'{filename}.new')
+    try:
+        download_file(url, chain_spec_new)
+        validate_file(chain_spec_new, file_type='json')
+    except BaseException:
+        chain_spec_new.unlink(missing_ok=True)
+        raise
+    os.replace(chain_spec_new, Path(c.CHAIN_SPEC_DIR, filename))
+    # Remember where the chain spec came from, so it is only downloaded again when the URL changes.
+    Path(c.CHAIN_SPEC_DIR, f'{filename}.url').write_text(url, encoding='utf-8')
+    # Make the next check see the chain spec that was just downloaded.
+    chain_spec_downloaded.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def chain_spec_downloaded(url: str, filename: Path) -> bool:
+    """Check if a chain spec file has already been downloaded from a given URL. The result is cached until the next download."""
+    try:
+        source_url = Path(c.CHAIN_SPEC_DIR, f'{filename}.url').read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return False
+    return source_url == url and Path(c.CHAIN_SPEC_DIR, filename).exists()
 
 
 def validate_file(filename: Path, file_type: str):
     if file_type == 'json':
+        # Check the size first so that a wrong url can't make the whole file get parsed into memory.
+        if os.path.getsize(filename) > MAX_CHAIN_SPEC_SIZE:
+            raise ValueError(f"Validating chain spec {filename} failed since it is larger than {MAX_CHAIN_SPEC_SIZE >> 20} MiB.")
         try:
-            file_obj = open(filename, 'r')
-            _ = json.load(file_obj)
-        except json.JSONDecodeError as e:
+            json.loads(filename.read_bytes())
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
             raise ValueError(f"Validating chain spec {filename} failed with error: {e}")
 
 def download_wasm_runtime(url):
@@ -224,69 +311,349 @@ def download_wasm_runtime(url):
         raise ValueError(f'Invalid file format provided for wasm-runtime-url: {filename.name}')
     if not c.WASM_DIR.exists():
         c.WASM_DIR.mkdir(parents=True)
-    with tempfile.TemporaryDirectory() as temp_dir:
+    # Download next to the wasm dir, so that the files are moved in with a rename instead of a copy.
+    with tempfile.TemporaryDirectory(dir=c.HOME_DIR) as temp_dir:
         try:
-            download_file(url, Path(temp_dir, filename))
+            if filename.name.endswith('.tar.gz'):
+                extract_tarball_from_url(url, temp_dir)
+            else:
+                download_file(url, Path(temp_dir, filename))
         except ValueError as e:
             logger.error(f'Failed to download wasm runtime: {e}')
             raise e
-        if filename.name.endswith('.tar.gz'):
-            tarball = open_tarfile(Path(temp_dir, filename), mode='r')
-            tarball.extractall(temp_dir)
-            tarball.close()
         stop_service()
-        files = glob.glob(f'{c.WASM_DIR}/*.wasm')
-        for f in files:
-            os.remove(f)
-        files_in_temp_dir = glob.glob(f'{temp_dir}/*')
+        _remove_wasm_files(c.WASM_DIR)
+        with os.scandir(temp_dir) as entries:
+            files_in_temp_dir = [entry.path for entry in entries]
         logger.debug('Files in temp_dir: %s', str(files_in_temp_dir))
-        wasm_files = glob.glob(f'{temp_dir}/*.wasm')
-        for wasm_file in wasm_files:
-            shutil.move(wasm_file, c.WASM_DIR)
-    sp.run(['chown', '-R', f'{c.USER}:{c.USER}', c.WASM_DIR], check=False)
+        for wasm_file in files_in_temp_dir:
+            if wasm_file.endswith('.wasm'):
+                os.replace(wasm_file, Path(c.WASM_DIR, os.path.basename(wasm_file)))
+    chown_to_user(c.WASM_DIR, recursive=True)
+
+
+def _remove_wasm_files(path: Path) -> None:
+    """Remove the .wasm files directly in a given directory."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.endswith('.wasm') and entry.is_file():
+                os.unlink(entry.path)
 
 
 def download_file(url: str, filepath: Path) -> None:
     """Download a file from a given URL to a given filepath."""
     logger.debug(f'Downloading file from {url} to {filepath}')
-    response = requests.get(url, timeout=None)
-    if response.status_code != 200:
-        raise ValueError(f"Download of file failed with: {response.text}")
-    with open(filepath, 'wb') as f:
-        f.write(response.content)
-    sp.run(['chown', '-R', f'{c.USER}:{c.USER}', filepath], check=False)
+    _download_stream(url, filepath)
+    chown_to_user(filepath)
+
+
+def _download_stream(url: str, filepath: Path, error_msg: str = "Download of file failed with: {}", mode: int = None) -> str:
+    """
+    Stream a file from a given URL to a given filepath in chunks and return its sha256 hash, computed while writing.
+    If a mode is given, the file is also given to the charm's user with that mode and synced to disk, ready to be moved into place.
+    """
+    response = _open_download(url, error_msg)
+    # Large files are downloaded in byte ranges instead, if the response shows that the server supports it.
+    size = _ranged_download_size(response)
+    if size:
+        response.close()
+        file_hash = _download_ranges(url, filepath, size, mode)
+        if file_hash:
+            return file_hash
+        logger.debug('Could not download %s in byte ranges, downloading it as a single stream', url)
+        response = _open_download(url, error_msg)
+    with response:
+        try:
+            with open(filepath, 'wb') as f:
+                file_hash = _stream_to_file(url, response, f, error_msg)
+                if mode is not None:
+                    f.flush()
+                    _prepare_for_install(f.fileno(), mode)
+        except BaseException:
+            # Don't leave a partially downloaded file behind.
+            filepath.unlink(missing_ok=True)
+            raise
+    return file_hash
+
+
+def _open_download(url: str, error_msg: str) -> requests.Response:
+    """Start streaming the file at a given URL, raising an error if the server does not serve it or announces a file that is too large."""
+    response = _SESSION.get(url, allow_redirects=True, stream=True, timeout=REQUEST_TIMEOUT)
+    try:
+        if response.status_code != 200:
+            raise ValueError(error_msg.format(_error_text(response)))
+        # Fail before writing anything if the server announces a file that is too large.
+        _check_download_size(int(response.headers.get('Content-Length') or 0), error_msg)
+    except BaseException:
+        response.close()
+        raise
+    return response
+
+
+def _stream_to_file(url: str, response: requests.Response, f, error_msg: str) -> str:
+    """
+    Write the streamed body of a response for a given URL to an open file and return its sha256 hash, computed while writing.
+    If the connection drops, the rest of the file is requested from where it stopped, when the server supports byte ranges.
+    """
+    # Byte offsets only match what is written if the content is not encoded.
+    resumable = response.headers.get('Accept-Ranges') == 'bytes' and 'Content-Encoding' not in response.headers
+    sha256 = hashlib.sha256()
+    downloaded = 0
+    resumes = 0
+    part = response
+    try:
+        while True:
+            try:
+                for chunk in part.iter_content(chunk_size=1 << 20):
+                    # The announced size can be missing or refer to the compressed content, so count what is written too.
+                    downloaded += len(chunk)
+                    _check_download_size(downloaded, error_msg)
+                    sha256.update(chunk)
+                    f.write(chunk)
+                return sha256.hexdigest()
+            except _INTERRUPTED_DOWNLOAD_ERRORS as e:
+                if not resumable or resumes == DOWNLOAD_RESUMES:
+                    raise
+                resumes += 1
+                logger.debug('Download of %s was interrupted at byte %d (%s), resuming it', url, downloaded, e)
+                part.close()
+                part = _resume_download(url, downloaded, error_msg)
+    finally:
+        part.close()
+
+
+def _resume_download(url: str, offset: int, error_msg: str) -> requests.Response:
+    """Request the rest of the file at a given URL from a given byte offset, checking that the server serves exactly that."""
+    response = _SESSION.get(url, headers={'Range': f'bytes={offset}-'}, allow_redirects=True, stream=True, timeout=REQUEST_TIMEOUT)
+    if response.status_code != 206 or not response.headers.get('Content-Range', '').startswith(f'bytes {offset}-'):
+        response.close()
+        raise ValueError(error_msg.format(f'server did not resume the download at byte {offset}'))
+    return response
+
+
+def _check_download_size(size: int, error_msg: str) -> None:
+    """Raise an error if a download of a given size is larger than any file the charm expects to download."""
+    if size > MAX_DOWNLOAD_SIZE:
+        raise ValueError(error_msg.format(f'file is larger than {MAX_DOWNLOAD_SIZE >> 30} GiB'))
+
+
+def _error_text(response: requests.Response) -> str:
+    """Get the start of the body of a streamed error response, without reading all of what could be a huge body."""
+    return response.raw.read(ERROR_TEXT_SIZE, decode_content=True).decode(response.encoding or 'utf-8', errors='replace')
+
+
+class _SizeLimitedReader():
+    """Reads from a streamed response body, raising an error once more than MAX_DOWNLOAD_SIZE has been read."""
+
+    def __init__(self, raw, error_msg: str):
+        self.__raw = raw
+        self.__error_msg = error_msg
+        self.__size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.__raw.read(size)
+        self.__size += len(data)
+        _check_download_size(self.__size, self.__error_msg)
+        return data
+
+
+def _ranged_download_size(response: requests.Response) -> int:
+    """Get the size of the file streamed by a response if it is large enough to be downloaded in parallel byte ranges, otherwise 0."""
+    if response.headers.get('Accept-Ranges') != 'bytes' or 'Content-Encoding' in response.headers:
+        return 0
+    size = int(response.headers.get('Content-Length') or 0)
+    return size if size >= RANGED_DOWNLOAD_MIN_SIZE else 0
+
+
+def _download_ranges(url: str, filepath: Path, size: int, mode: int = None) -> str:
+    """
+    Download a file of a given size from a given URL in parallel byte ranges, each written at its offset in the file.
+    Returns the sha256 hash of the file, or an empty string if the server did not serve the ranges or a range kept failing.
+    """
+    part_size = -(-size // RANGED_DOWNLOAD_PARTS)
+    byte_ranges = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+    try:
+        fd = _open_preallocated(filepath, size)
+        try:
+            complete = _download_all_ranges(url, fd, byte_ranges)
+            if complete and mode is not None:
+                _prepare_for_install(fd, mode)
+        finally:
+            os.close(fd)
+        if complete:
+            return _file_hash(filepath)
+    except BaseException:
+        filepath.unlink(missing_ok=True)
+        raise
+    filepath.unlink(missing_ok=True)
+    return ''
+
+
+def _download_all_ranges(url: str, fd: int, byte_ranges: list) -> bool:
+    """Download the (start, end) byte ranges of the file at a given URL concurrently into an open file, and return whether all of them were."""
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(byte_ranges)) as executor:
+        futures = [executor.submit(_download_range, url, fd, start, end, stop) for start, end in byte_ranges]
+        try:
+            for future in as_completed(futures):
+                if not future.result():
+                    return False
+            return True
+        finally:
+            # The file is not used if any range failed, so stop the ranges that are still downloading.
+            stop.set()
+            for future in futures:
+                future.cancel()
+
+
+def _open_preallocated(filepath: Path, size: int) -> int:
+    """Open a file for writing with its blocks allocated up front for a given size, and return its file descriptor."""
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError:
+        # Not every filesystem supports allocating blocks, so fall back to just setting the size.
+        os.ftruncate(fd, size)
+    return fd
+
+
+def _download_range(url: str, fd: int, start: int, end: int, stop: threading.Event) -> bool:
+    """
+    Download the bytes from start to end (inclusive) of the file at a given URL into an open file, at the same offsets.
+    If the connection drops, the rest of the range is requested again from where it stopped. Gives up once 'stop' is set.
+    """
+    offset = start
+    for _ in range(DOWNLOAD_RESUMES + 1):
+        headers = {'Range': f'bytes={offset}-{end}'}
+        try:
+            with _RANGE_SLOTS:
+                # Another range may have failed while this one waited for a slot.
+                if stop.is_set():
+                    return False
+                with _SESSION.get(url, headers=headers, allow_redirects=True, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                    if response.status_code != 206 or not response.headers.get('Content-Range', '').startswith(f'bytes {offset}-{end}/'):
+                        return False
+                    for chunk in response.iter_content(chunk_size=1 << 20):
+                        if stop.is_set():
+                            return False
+                        offset = _pwrite_all(fd, chunk, offset)
+        except _INTERRUPTED_DOWNLOAD_ERRORS as e:
+            logger.debug('Download of bytes %d-%d of %s was interrupted (%s), resuming it', offset, end, url, e)
+            continue
+        return offset == end + 1
+    return False
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int) -> int:
+    """Write all of some data at a given offset in an open file, and return the offset right after it."""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+    return offset
+
+
+def _prepare_for_install(fd: int, mode: int) -> None:
+    """Give an open file to the charm's user with a given mode and sync it to disk, through its file descriptor."""
+    uid, gid = _user_ids()
+    os.fchown(fd, uid, gid)
+    os.fchmod(fd, mode)
+    os.fsync(fd)
+
+
+def chown_to_user(path: Path, recursive: bool = False) -> None:
+    """Give a path to the charm's user, like 'chown' does. When recursive, symlinks in the tree are changed themselves, not followed, like 'chown -R' does."""
+    try:
+        uid, gid = _user_ids()
+    except KeyError:
+        # Like a failing 'chown', leave the path as it is if the user has not been created yet.
+        logger.warning(f'Could not give {path} to {c.USER}, the user does not exist')
+        return
+    os.chown(path, uid, gid)
+    if recursive:
+        for root, dirs, files in os.walk(path):
+            for name in dirs + files:
+                os.chown(os.path.join(root, name), uid, gid, follow_symlinks=False)
+
+
+def _make_executable(path: Path) -> None:
+    """Add execute permissions to a file, like 'chmod +x' does."""
+    os.chmod(path, os.stat(path).st_mode | 0o111)
+
+
+@functools.lru_cache(maxsize=1)
+def _user_ids() -> tuple:
+    """Get the uid and gid of the charm's user. Looked up on first use, since the user is created in the install hook."""
+    return pwd.getpwnam(c.USER).pw_uid, grp.getgrnam(c.USER).gr_gid
+
+
+def _file_hash(filepath: Path, algorithm: str = 'sha256') -> str:
+    """Compute the hash of a file with a given hashlib algorithm, reading it in chunks."""
+    if hasattr(hashlib, 'file_digest'):
+        # Python 3.11+ runs the same read loop in C.
+        with open(filepath, 'rb', buffering=0) as f:
+            return hashlib.file_digest(f, algorithm).hexdigest()
+    file_hash = hashlib.new(algorithm)
+    # Read into one reused buffer, so large chunks go straight to hashlib without allocating a new bytes object each time
+    buffer = bytearray(1 << 20)
+    view = memoryview(buffer)
+    with open(filepath, 'rb', buffering=0) as f:
+        while size := f.readinto(buffer):
+            file_hash.update(view[:size])
+    return file_hash.hexdigest()
+
+
+def extract_tarball_from_url(url: str, path: str) -> None:
+    """Stream a tarball from a given URL and extract it to a given path in one pass, without storing the tarball itself."""
+    logger.debug(f'Extracting tarball from {url} to {path}')
+    with _SESSION.get(url, allow_redirects=True, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        error_msg = "Download of file failed with: {}"
+        if response.status_code != 200:
+            raise ValueError(error_msg.format(_error_text(response)))
+        _check_download_size(int(response.headers.get('Content-Length') or 0), error_msg)
+        # Undo any Content-Encoding of the response, as reading it in full would
+        response.raw.decode_content = True
+        with open_tarfile(fileobj=_SizeLimitedReader(response.raw, error_msg), mode='r|*') as tarball:
+            if hasattr(tarfile, 'data_filter'):
+                # Reject absolute paths, links out of the directory and device files, on Pythons that support extraction filters
+                tarball.extractall(path, filter='data')
+            else:
+                tarball.extractall(path)
 
 
 def setup_group_and_user():
     sp.run(['addgroup', '--system', c.USER], check=False)
     sp.run(['adduser', '--system', '--home', c.HOME_DIR, '--disabled-password', '--ingroup', c.USER, c.USER], check=False)
-    sp.run(['chown', f'{c.USER}:{c.USER}', c.HOME_DIR], check=False)
-    sp.run(['chmod', '700', c.HOME_DIR], check=False)
+    chown_to_user(c.HOME_DIR)
+    os.chmod(c.HOME_DIR, 0o700)
 
 
 def create_env_file_for_service():
-    with open(f'/etc/default/{c.USER}', 'w', encoding='utf-8') as f:
+    with open(c.ENV_FILE, 'w', encoding='utf-8') as f:
         f.write(f'{c.USER.upper()}_CLI_ARGS=\'\'')
 
 
 def install_service_file(source_path):
-    target_path = Path(f'/etc/systemd/system/{c.USER}.service')
-    shutil.copyfile(source_path, target_path)
+    shutil.copyfile(source_path, c.SERVICE_FILE)
     sp.run(['systemctl', 'daemon-reload'], check=False)
 
 def render_service_argument_file(service_args):
     return f"{c.USER.upper()}_CLI_ARGS='{service_args}'\n"
 
 def arguments_differ_from_disk(service_args):
+    rendered = render_service_argument_file(service_args).encode('utf-8')
     try:
-        with open(f'/etc/default/{c.USER}', 'r', encoding='utf-8') as f:
-            args = f.read()
-        return args != render_service_argument_file(service_args)
+        with open(c.ENV_FILE, 'rb') as f:
+            # Files of different sizes differ, which is known without reading the file.
+            if os.fstat(f.fileno()).st_size != len(rendered):
+                return True
+            return f.read() != rendered
     except FileNotFoundError:
         return True
     
 def update_service_args(service_args):
-    with open(f'/etc/default/{c.USER}', 'w', encoding='utf-8') as f:
+    with open(c.ENV_FILE, 'w', encoding='utf-8') as f:
         f.write(render_service_argument_file(service_args))
     sp.run(['systemctl', 'restart', f'{c.USER}.service'], check=False)
 
@@ -306,32 +673,55 @@ def get_binary_version() -> str:
     """ Returns the version of the binary client by checking the '--version' flag. """
     logger.debug("Getting binary version from client binary.")
     if c.BINARY_FILE.exists():
-        try:
-            command = [c.BINARY_FILE, "--version"]
-            output = sp.run(command, stdout=sp.PIPE, check=False).stdout.decode('utf-8').strip()
-            version = re.search(r'([\d.]+)', output).group(1)
-            return version
-        except (sp.SubprocessError, IndexError, AttributeError) as e:
-            logger.error("Couldn't get binary version: %s", {e})
+        binary_stat = os.stat(c.BINARY_FILE)
+        return _get_binary_version(binary_stat.st_mtime_ns, binary_stat.st_size)
     return ""
 
 
-def get_binary_md5sum() -> str:
-    if c.BINARY_FILE.exists():
-        command = ['md5sum', c.BINARY_FILE]
-        md5sum_output = sp.run(command, stdout=sp.PIPE, check=False).stdout.decode('utf-8').strip()
-        return md5sum_output.split(' ')[0]  # Output includes path of binary, which we skip including
+@functools.lru_cache(maxsize=1)
+def _get_binary_version(binary_mtime_ns: int, binary_size: int) -> str:
+    """Run the client binary with '--version'. Cached on the binary's modification time and size, since the output only changes with the binary."""
+    try:
+        command = [c.BINARY_FILE, "--version"]
+        output = sp.run(command, stdout=sp.PIPE, check=False).stdout
+        # The version number is ASCII, so match on the raw output and only decode the match
+        version = _VERSION_PATTERN.search(output).group(1).decode('ascii')
+        return version
+    except (sp.SubprocessError, IndexError, AttributeError) as e:
+        logger.error("Couldn't get binary version: %s", {e})
     return ""
 
 
+def get_binary_md5sum(stored_hash: dict = None) -> str:
+    """
+    Get the md5 hash of the client binary.
+    'stored_hash' is a dict in the charm's state that keeps the hash between hooks, keyed on the binary's inode,
+    modification time and size, which all change when a new binary is moved into place.
+    """
+    if not c.BINARY_FILE.exists():
+        return ""
+    binary_stat = os.stat(c.BINARY_FILE)
+    key = f'{binary_stat.st_ino}:{binary_stat.st_mtime_ns}:{binary_stat.st_size}'
+    if stored_hash is not None and stored_hash.get('key') == key:
+        return stored_hash['md5']
+    md5 = _get_binary_md5sum(binary_stat.st_mtime_ns, binary_stat.st_size)
+    if stored_hash is not None:
+        stored_hash['key'] = key
+        stored_hash['md5'] = md5
+    return md5
+
+
+@functools.lru_cache(maxsize=1)
+def _get_binary_md5sum(binary_mtime_ns: int, binary_size: int) -> str:
+    """Hash the client binary. Cached on the binary's modification time and size, so an unchanged binary is not read again."""
+    return _file_hash(c.BINARY_FILE, 'md5')
+
+
 def get_binary_last_changed() -> str:
     if c.BINARY_FILE.exists():
-        command = ['stat', c.BINARY_FILE]
-        stat_output = sp.run(command, stdout=sp.PIPE, check=False).stdout.decode('utf-8').strip()
-        stat_split = re.split('Change: ', stat_output)[1].split(' ')
-        date = stat_split[0]
-        timestamp = stat_split[1].split('.')[0]
-        return date + ' ' + timestamp  # TODO: make this check if system time is in UTC, and print that?
+        # Status change time of the binary itself, not of what it may link to, in the same format as 'stat' prints it
+        changed = datetime.fromtimestamp(os.lstat(c.BINARY_FILE).st_ctime)
+        return changed.strftime('%Y-%m-%d %H:%M:%S')  # TODO: make this check if system time is in UTC, and print that?
     return ""
 
 
@@ -341,8 +731,9 @@ def restart_service():
 
 def start_service():
     # TODO: remove chown and chmod from here? Runs in the install hook already
-    sp.run(['chown', f'{c.USER}:{c.USER}', c.BINARY_FILE], check=False)
-    sp.run(['chmod', '+x', c.BINARY_FILE], check=False)
+    if c.BINARY_FILE.exists():
+        chown_to_user(c.BINARY_FILE)
+        _make_executable(c.BINARY_FILE)
     sp.run(['systemctl', 'start', f'{c.USER}.service'], check=False)
 
 
@@ -351,40 +742,86 @@ def stop_service():
 
 
 def service_started(iterations: int = 6) -> bool:
-    """Checks if the service is running by running the the 'service status' command."""
-    for _ in range(iterations):
-        service_status = os.system(f'service {c.SERVICE_NAME} status')
+    """Checks if the service is running with 'systemctl is-active', checking up to 'iterations' times, a second apart."""
+    for i in range(iterations):
+        service_status = sp.run(['systemctl', 'is-active', '--quiet', f'{c.SERVICE_NAME}.service'], check=False).returncode
         if service_status == 0:
             return True
-        time.sleep(1)
+        # No need to wait after the last check
+        if i < iterations - 1:
+            time.sleep(1)
     return False
 
 
 def write_node_key_file(key):
     with open(c.NODE_KEY_FILE, "w", encoding='utf-8') as f:
         f.write(key)
-    sp.run(['chown', f'{c.USER}:{c.USER}', c.NODE_KEY_FILE], check=False)
-    sp.run(['chmod', '0600', c.NODE_KEY_FILE], check=False)
+    chown_to_user(c.NODE_KEY_FILE)
+    os.chmod(c.NODE_KEY_FILE, 0o600)
 
 
 def generate_node_key():
     command = [c.BINARY_FILE, 'key', 'generate-node-key', '--file', c.NODE_KEY_FILE]
     sp.run(command, check=False)
-    sp.run(['chown', f'{c.USER}:{c.USER}', c.NODE_KEY_FILE], check=False)
-    sp.run(['chmod', '0600', c.NODE_KEY_FILE], check=False)
+    if c.NODE_KEY_FILE.exists():
+        chown_to_user(c.NODE_KEY_FILE)
+        os.chmod(c.NODE_KEY_FILE, 0o600)
 
 
 def get_disk_usage(path: Path) -> str:
     if not path.exists():
         return ''
-    command = ['du', str(path), '-hs']
-    output = sp.run(command, stdout=sp.PIPE, check=False).stdout.decode('utf-8')
+    cached = _DISK_USAGE_CACHE.get(path)
+    if cached and time.monotonic() - cached[0] < DISK_USAGE_TTL:
+        return cached[1]
     try:
-        size = re.search(r'(\d+(\.\d+)?[GKMT])', output).group(1)
-        return size
-    except AttributeError as e:
-        logger.warning("Couldn't parse return from 'du' command: %s", {e})
-        return "Error parsing disk usage"
+        size = _humanize_size(_disk_usage(path))
+    except OSError as e:
+        logger.warning("Couldn't get disk usage of %s: %s", path, {e})
+        return "Error getting disk usage"
+    _DISK_USAGE_CACHE[path] = (time.monotonic(), size)
+    return size
+
+
+def _disk_usage(path: Path) -> int:
+    """Sum up the disk usage in bytes of a directory tree like 'du' does, counting hard linked files once."""
+    total = os.lstat(path).st_blocks * 512
+    seen_inodes = set()
+    directories = [path]
+    while directories:
+        try:
+            entries = os.scandir(directories.pop())
+        except OSError:
+            # The directory is unreadable or was removed while walking the tree
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    # The file was removed while walking the tree
+                    continue
+                if is_dir:
+                    directories.append(entry.path)
+                elif stat.st_nlink > 1:
+                    if (stat.st_dev, stat.st_ino) in seen_inodes:
+                        continue
+                    seen_inodes.add((stat.st_dev, stat.st_ino))
+                total += stat.st_blocks * 512
+    return total
+
+
+def _humanize_size(size: int) -> str:
+    """Format a size in bytes the way 'du -h' does, rounding up, e.g. '4.0K', '15M' or '1.2T'."""
+    if size < 1024:
+        return str(size)
+    for unit in 'KMGTPE':
+        size /= 1024
+        rounded = math.ceil(size * 10) / 10 if size < 10 else math.ceil(size)
+        if rounded < 1024:
+            break
+    return f'{rounded:.1f}{unit}' if rounded < 10 else f'{math.ceil(rounded)}{unit}'
 
 
 def get_chain_disk_usage() -> str:
@@ -400,23 +837,33 @@ def get_relay_disk_usage() -> str:
 
 
 def get_service_args() -> str:
-    command = ['cat', f'/etc/default/{c.USER}']
-    cat_output = sp.run(command, stdout=sp.PIPE, check=False).stdout.decode('utf-8').strip()
-    return cat_output.split('=')[1]  # cat:ed file includes the env variable name, which we skip including
+    with open(c.ENV_FILE, 'r', encoding='utf-8') as f:
+        env_file = f.read().strip()
+    return env_file.split('=', 1)[1]  # The file includes the env variable name, which we skip including
 
 
 def get_polkadot_process_id() -> str:
-    command = ['pgrep', f'{c.USER}']
-    pgrep_output = sp.run(command, stdout=sp.PIPE, check=False).stdout.decode('utf-8').strip()
-    return pgrep_output
+    """Get the id of the client process by scanning /proc for a process named like the client binary."""
+    for proc_id in sorted((entry for entry in os.listdir('/proc') if entry.isdigit()), key=int):
+        try:
+            with open(f'/proc/{proc_id}/comm', 'r', encoding='utf-8') as f:
+                if f.read().rstrip('\n') == c.USER:
+                    return proc_id
+        except OSError:
+            # The process exited while scanning
+            continue
+    return ""
 
 
 def get_polkadot_proc_cmdline() -> str:
     proc_id = get_polkadot_process_id()
     if proc_id:
-        command = f'cat /proc/{proc_id}/cmdline'  # Uses NUL bytes as delimiter
-        cat_output = sp.run(command, stdout=sp.PIPE, shell=True, check=False).stdout.decode().split('\x00')
-        str_output = ' '.join(cat_output)
+        try:
+            with open(f'/proc/{proc_id}/cmdline', 'rb') as f:
+                cmdline = f.read().decode().split('\x00')  # Uses NUL bytes as delimiter
+        except OSError:
+            return ""
+        str_output = ' '.join(cmdline)
         return str_output
     return ""
 
@@ -430,9 +877,7 @@ def is_parachain_node() -> bool:
     if c.DB_CHAIN_DIR.exists() and c.DB_RELAY_DIR.exists():
         return True
     if c.BINARY_FILE.exists():
-        command = f'.{c.BINARY_FILE} --help | grep -i "\-\-collator"'
-        output = sp.run(command, stdout=sp.PIPE, cwd='/', shell=True, check=False)
-        if output.returncode == 0:
+        if '--collator' in get_client_binary_help_output().lower():
             return True
     return False
 
@@ -471,14 +916,20 @@ def get_wasm_info() -> str:
 
 def get_client_binary_help_output() -> str:
     if c.BINARY_FILE.exists():
-        command = f'.{c.BINARY_FILE} --help'
-        process = sp.run(command, stdout=sp.PIPE, cwd='/', shell=True, check=False)
-        if process.returncode == 0:
-            return process.stdout.decode('utf-8').strip()
-        return "Could not parse client binary '--help' command"
+        binary_stat = os.stat(c.BINARY_FILE)
+        return _get_client_binary_help_output(binary_stat.st_mtime_ns, binary_stat.st_size)
     return "Client binary not found"
 
 
+@functools.lru_cache(maxsize=1)
+def _get_client_binary_help_output(binary_mtime_ns: int, binary_size: int) -> str:
+    """Run the client binary with '--help'. Cached on the binary's modification time and size, since the output only changes with the binary."""
+    process = sp.run([c.BINARY_FILE, '--help'], stdout=sp.PIPE, check=False)
+    if process.returncode == 0:
+        return process.stdout.decode('utf-8').strip()
+    return "Could not parse client binary '--help' command"
+
+
 def get_readme() -> str:
     path = Path('README.md')
     if path.exists():
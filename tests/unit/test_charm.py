@@ -2,17 +2,59 @@
 # See LICENSE file for licensing details.
 
 import unittest
-# from unittest.mock import Mock
+from unittest.mock import patch
 
+import ops
 from ops.testing import Harness
 from charm import PolkadotCharm
 
+SERVICE_ARGS = '--chain=polkadot --rpc-port=9933'
+
 
 class TestCharm(unittest.TestCase):
-    def test_config_changed(self):
-        harness = Harness(Polkadot  Charm)
-        self.addCleanup(harness.cleanup)
-        harness.begin()
-        self.assertEqual(harness.charm._stored.validator_name, "Dwellir")
-        harness.update_config({"validator-name": "NameChanged"})
-        self.assertEqual(harness.charm._stored.validator_name, "NameChanged")
+    def setUp(self):
+        # The charm installs and runs the client through utils, which is replaced so that nothing touches the machine.
+        patcher = patch('charm.utils')
+        self.utils = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.utils.get_binary_version.return_value = '1.5.0'
+        # Each test is a new hook, so start without the ServiceArgs of earlier tests.
+        patcher = patch.dict('service_args._CACHE', clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.harness = Harness(PolkadotCharm)
+        self.addCleanup(self.harness.cleanup)
+        self.harness.begin()
+
+    def test_config_changed_service_args(self):
+        self.harness.update_config({'service-args': SERVICE_ARGS})
+        self.assertEqual(self.harness.charm._stored.service_args, SERVICE_ARGS)
+        self.utils.update_service_args.assert_called_once()
+        self.assertIn('--chain polkadot', self.utils.update_service_args.call_args.args[0])
+        self.assertEqual(self.harness.model.unit.status, ops.ActiveStatus('Service running'))
+
+    def test_config_changed_binary_url(self):
+        binary_url = 'https://example.com/polkadot'
+        self.harness.update_config({'service-args': SERVICE_ARGS, 'binary-url': binary_url})
+        self.assertEqual(self.harness.charm._stored.binary_url, binary_url)
+        self.utils.install_binary.assert_called_once()
+        self.assertEqual(self.utils.install_binary.call_args.args[1], 'polkadot')
+
+    def test_config_changed_invalid_service_args(self):
+        self.harness.update_config({'service-args': '--rpc-port=9933'})
+        self.assertEqual(self.harness.model.unit.status, ops.BlockedStatus("'--chain' must be set in 'service-args'."))
+        self.assertEqual(self.harness.charm._stored.service_args, '')
+        self.utils.update_service_args.assert_not_called()
+
+    def test_install_with_chain_spec_url(self):
+        chain_spec_url = 'https://example.com/chain-spec.json'
+        self.harness.disable_hooks()
+        self.harness.update_config({'service-args': SERVICE_ARGS, 'chain-spec-url': chain_spec_url})
+        self.harness.enable_hooks()
+        with patch('service_args.utils') as service_args_utils:
+            service_args_utils.chain_spec_downloaded.return_value = False
+            # The chain spec is given to the polkadot user, so the user must exist before it is downloaded.
+            service_args_utils.download_chain_spec.side_effect = lambda url, filename: self.utils.setup_group_and_user.assert_called_once()
+            self.harness.charm.on.install.emit()
+        service_args_utils.download_chain_spec.assert_called_once_with(chain_spec_url, 'chain-spec.json')
+        self.assertIn('--chain /home/polkadot/spec/chain-spec.json', self.utils.update_service_args.call_args.args[0])
@@ -0,0 +1,137 @@
+# Copyright 2021 dwellir
+# See LICENSE file for licensing details.
+
+import json
+import socket
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import urllib3
+
+import polkadot_rpc_wrapper
+from polkadot_rpc_wrapper import PolkadotRpcWrapper, RpcError
+
+# The real transport, which the tests replace with a FakeNode.
+_REQUEST = urllib3.PoolManager.request
+
+
+class FakeNode:
+    """Answers the JSON-RPC requests sent through the wrapper's urllib3 pool with the results it is set up with."""
+
+    def __init__(self, results: dict):
+        # Method name -> result, or a function of the params returning the result.
+        self.results = results
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def request(self, method, url, body=None, **kwargs):
+        request = json.loads(body)
+        if isinstance(request, list):
+            return Mock(data=json.dumps([self.__answer(r) for r in request]).encode())
+        return Mock(data=json.dumps(self.__answer(request)).encode())
+
+    def __answer(self, request: dict) -> dict:
+        with self.lock:
+            self.calls.append(request['method'])
+        result = self.results[request['method']]
+        if callable(result):
+            result = result(request['params'])
+        if isinstance(result, RpcError):
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32601, 'message': str(result)}}
+        return {'jsonrpc': '2.0', 'id': request['id'], 'result': result}
+
+
+class TestPolkadotRpcWrapper(unittest.TestCase):
+
+    def setUp(self):
+        # Results and interfaces are shared between wrappers of the same node, so start each test without them.
+        for shared in (polkadot_rpc_wrapper._RESULT_CACHE, polkadot_rpc_wrapper._SUBSTRATE_INTERFACES):
+            patcher = patch.dict(shared, clear=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.node = FakeNode({'system_health': {'isSyncing': False, 'peers': 12, 'shouldHavePeers': True},
+                              'system_version': '1.5.0-e5b2adac7ad',
+                              'chain_getHeader': {'number': '0x1257'}})
+        patcher = patch.object(urllib3.PoolManager, 'request', side_effect=self.node.request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.wrapper = PolkadotRpcWrapper(9933)
+
+    def test_poll_status(self):
+        self.assertEqual(self.wrapper.poll_status(), {'syncing': False, 'height': 0x1257, 'version': '1.5.0'})
+        self.assertEqual(self.node.calls, ['system_health', 'chain_getHeader', 'system_version'])
+
+    def test_results_are_cached_between_wrappers_until_they_expire(self):
+        with patch.object(polkadot_rpc_wrapper.time, 'monotonic', return_value=100.0) as monotonic:
+            self.assertFalse(self.wrapper.is_syncing())
+            self.assertEqual(PolkadotRpcWrapper(9933).get_peer_count(), 12)
+            self.assertEqual(self.node.calls, ['system_health'])
+            # Another node has results of its own.
+            PolkadotRpcWrapper(9944).is_syncing()
+            self.assertEqual(self.node.calls, ['system_health'] * 2)
+            monotonic.return_value = 101.0
+            self.node.results['system_health'] = {'isSyncing': True, 'peers': 3, 'shouldHavePeers': True}
+            self.assertTrue(self.wrapper.is_syncing())
+            self.assertEqual(self.node.calls, ['system_health'] * 3)
+
+    def test_version_is_cached_longer(self):
+        with patch.object(polkadot_rpc_wrapper.time, 'monotonic', return_value=100.0) as monotonic:
+            self.assertEqual(self.wrapper.get_version(), '1.5.0')
+            monotonic.return_value = 399.0
+            self.assertEqual(self.wrapper.get_version(), '1.5.0')
+            self.assertEqual(self.node.calls, ['system_version'])
+            monotonic.return_value = 400.0
+            self.wrapper.get_version()
+            self.assertEqual(self.node.calls, ['system_version'] * 2)
+
+    def test_error_responses(self):
+        self.node.results['system_health'] = RpcError('Method not found')
+        with self.assertRaisesRegex(RpcError, 'Method not found'):
+            self.wrapper.is_syncing()
+        with self.assertRaisesRegex(RpcError, 'Method not found'):
+            self.wrapper.poll_status()
+        self.node.results['system_peers'] = RpcError('Method not found')
+        self.assertEqual(self.wrapper.get_system_peers(), (['Method not found'], False))
+
+    def test_error_responses_are_not_cached(self):
+        self.node.results['system_health'] = RpcError('Method not found')
+        with self.assertRaises(RpcError):
+            self.wrapper.is_syncing()
+        self.node.results['system_health'] = {'isSyncing': True, 'peers': 3, 'shouldHavePeers': True}
+        self.assertTrue(self.wrapper.is_syncing())
+
+    def test_connection_errors_are_raised_as_urllib3_errors(self):
+        with socket.socket() as s:
+            s.bind(('localhost', 0))
+            port = s.getsockname()[1]
+        with patch.object(urllib3.PoolManager, 'request', _REQUEST):
+            with self.assertRaises(urllib3.exceptions.HTTPError):
+                PolkadotRpcWrapper(port).is_syncing()
+
+    @patch.object(polkadot_rpc_wrapper, 'SubstrateInterface')
+    def test_is_validating_this_era_stops_at_a_match(self, substrate_interface):
+        validators = [(f'validator-{i}', {'grandpa': f'0x{i:04x}', 'babe': f'0x{i:04x}'}) for i in range(200)]
+        substrate_interface.return_value.query.return_value.value_serialized = validators
+
+        def has_session_key(params):
+            if params[0] == '0x00050005':
+                return True
+            time.sleep(0.01)
+            return False
+        self.node.results['author_hasSessionKeys'] = has_session_key
+        self.assertEqual(self.wrapper.is_validating_this_era(), {'validator': 'validator-5', 'session_key': '0x00050005'})
+        # The keys that were not checked yet when the match was found are skipped.
+        self.assertLess(len(self.node.calls), len(validators))
+
+    @patch.object(polkadot_rpc_wrapper, 'SubstrateInterface')
+    def test_is_validating_this_era_without_a_match(self, substrate_interface):
+        validators = [(f'validator-{i}', {'grandpa': f'0x{i:04x}'}) for i in range(40)]
+        substrate_interface.return_value.query.return_value.value_serialized = validators
+        self.node.results['author_hasSessionKeys'] = False
+        self.assertFalse(self.wrapper.is_validating_this_era())
+        self.assertEqual(len(self.node.calls), len(validators))
+        # The interface is shared with later wrappers of the same node.
+        PolkadotRpcWrapper(9933).is_validating_this_era()
+        substrate_interface.assert_called_once_with(url='http://localhost:9933')
@@ -0,0 +1,100 @@
+# Copyright 2021 dwellir
+# See LICENSE file for licensing details.
+
+import unittest
+from unittest.mock import patch
+
+import service_args
+from service_args import ServiceArgs
+
+NODE_KEY_ARGS = '--node-key-file /home/polkadot/node-key'
+CHAIN_SPEC = '/home/polkadot/spec/chain-spec.json'
+RELAYCHAIN_SPEC = '/home/polkadot/spec/relaychain-spec.json'
+
+
+class TestServiceArgs(unittest.TestCase):
+
+    def setUp(self):
+        # The chain specs are downloaded while the args are customized, which should not reach the network.
+        patcher = patch('service_args.utils')
+        self.utils = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.utils.chain_spec_downloaded.return_value = False
+
+    def assertServiceArgs(self, service_args: str, expected: str, relay_rpc_urls: list = None, **config):
+        config = {key.replace('_', '-'): value for key, value in config.items()}
+        config['service-args'] = service_args
+        self.assertEqual(ServiceArgs(config, relay_rpc_urls or []).service_args_string, expected)
+
+    def test_plain_chain(self):
+        self.assertServiceArgs('--chain polkadot --rpc-port 9933', f'{NODE_KEY_ARGS} --chain polkadot --rpc-port 9933')
+        self.assertServiceArgs('--chain=polkadot --rpc-port=9933 --name=node', f'{NODE_KEY_ARGS} --chain polkadot --rpc-port 9933 --name node')
+
+    def test_whitespace_is_normalized(self):
+        self.assertServiceArgs('  --chain polkadot   --rpc-port 9933 ', f'{NODE_KEY_ARGS} --chain polkadot --rpc-port 9933')
+
+    def test_prefix_args_order(self):
+        self.assertServiceArgs('--chain statemint --rpc-port 9933 -- --chain polkadot',
+                               '--wasm-runtime-overrides /home/polkadot/wasm --relay-chain-rpc-urls ws://a:9944 ws://b:9944 '
+                               f'{NODE_KEY_ARGS} --chain statemint --rpc-port 9933 -- --chain polkadot',
+                               relay_rpc_urls=['ws://a:9944', 'ws://b:9944'], wasm_runtime_url='https://example.com/runtime.wasm')
+
+    def test_hardcoded_chains(self):
+        self.assertServiceArgs('--chain aleph-zero-testnet --rpc-port 9933', f'{NODE_KEY_ARGS} --chain testnet --rpc-port 9933')
+        self.assertServiceArgs('--chain aleph-zero-mainnet --rpc-port 9933', f'{NODE_KEY_ARGS} --chain mainnet --rpc-port 9933')
+        self.assertServiceArgs('--chain crust-maxwell --rpc-port 9933', f'{NODE_KEY_ARGS} --chain maxwell --rpc-port 9933')
+        self.assertServiceArgs('--chain sora-another-network --rpc-port 9933', f'{NODE_KEY_ARGS} --chain another-network --rpc-port 9933')
+
+    def test_chain_spec_url_overrides_hardcoded_chain(self):
+        self.assertServiceArgs('--chain sora-main --rpc-port 9933', f'{NODE_KEY_ARGS} --chain {CHAIN_SPEC} --rpc-port 9933',
+                               chain_spec_url='https://example.com/chain-spec.json')
+        self.utils.download_chain_spec.assert_called_once_with('https://example.com/chain-spec.json', 'chain-spec.json')
+
+    def test_local_relaychain_spec_url_replaces_relay_chain(self):
+        self.assertServiceArgs('--chain para --rpc-port 9933 -- --chain kusama',
+                               f'{NODE_KEY_ARGS} --chain para --rpc-port 9933 -- --chain {RELAYCHAIN_SPEC}',
+                               local_relaychain_spec_url='https://example.com/relaychain-spec.json')
+
+    def test_local_relaychain_spec_url_adds_relay_chain(self):
+        expected = f'{NODE_KEY_ARGS} --chain para --rpc-port 9933 -- --chain {RELAYCHAIN_SPEC}'
+        self.assertServiceArgs('--chain para --rpc-port 9933 --', expected, local_relaychain_spec_url='https://example.com/relaychain-spec.json')
+        self.assertServiceArgs('--chain para --rpc-port 9933', expected, local_relaychain_spec_url='https://example.com/relaychain-spec.json')
+
+    def test_both_chain_spec_urls(self):
+        self.assertServiceArgs('--chain para --rpc-port 9933', f'{NODE_KEY_ARGS} --chain {CHAIN_SPEC} --rpc-port 9933 -- --chain {RELAYCHAIN_SPEC}',
+                               chain_spec_url='https://example.com/chain-spec.json',
+                               local_relaychain_spec_url='https://example.com/relaychain-spec.json')
+        self.assertEqual(self.utils.download_chain_spec.call_count, 2)
+
+    def test_downloaded_chain_spec_is_not_downloaded_again(self):
+        self.utils.chain_spec_downloaded.return_value = True
+        self.assertServiceArgs('--chain para --rpc-port 9933', f'{NODE_KEY_ARGS} --chain {CHAIN_SPEC} --rpc-port 9933',
+                               chain_spec_url='https://example.com/chain-spec.json')
+        self.utils.download_chain_spec.assert_not_called()
+
+    def test_required_args(self):
+        with self.assertRaisesRegex(ValueError, "'--chain' must be set"):
+            ServiceArgs({'service-args': '--rpc-port 9933'}, [])
+        with self.assertRaisesRegex(ValueError, "'--node-key-file' may not be set"):
+            ServiceArgs({'service-args': '--chain polkadot --rpc-port 9933 --node-key-file key'}, [])
+
+    @patch.dict(service_args._CACHE, clear=True)
+    def test_get_reuses_objects_built_from_the_same_values(self):
+        config = {'service-args': '--chain para --rpc-port 9933', 'chain-spec-url': 'https://example.com/chain-spec.json'}
+        cached = ServiceArgs.get(config, ['ws://a:9944'])
+        self.assertIs(ServiceArgs.get(dict(config), ['ws://a:9944']), cached)
+        self.utils.download_chain_spec.assert_called_once()
+
+    @patch.dict(service_args._CACHE, clear=True)
+    def test_get_misses_on_changed_values(self):
+        config = {'service-args': '--chain para --rpc-port 9933'}
+        cached = ServiceArgs.get(config, [])
+        for key, value in (('service-args', '--chain para --rpc-port 9944'),
+                           ('chain-spec-url', 'https://example.com/chain-spec.json'),
+                           ('local-relaychain-spec-url', 'https://example.com/relaychain-spec.json'),
+                           ('wasm-runtime-url', 'https://example.com/runtime.wasm')):
+            with self.subTest(key=key):
+                self.assertIsNot(ServiceArgs.get({**config, key: value}, []), cached)
+        self.assertIsNot(ServiceArgs.get(config, ['ws://a:9944']), cached)
+        self.assertEqual(ServiceArgs.get(config, ['ws://b:9944']).service_args_string,
+                         '--relay-chain-rpc-urls ws://b:9944 --node-key-file /home/polkadot/node-key --chain para --rpc-port 9933')
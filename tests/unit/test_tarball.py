@@ -0,0 +1,51 @@
+# Copyright 2021 dwellir
+# See LICENSE file for licensing details.
+
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import tarball
+from tarball import Tarball
+
+
+class TestTarball(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dir = Path(temp_dir.name)
+        self.binary = Path(self.dir, 'polkadot')
+        self.tarball_path = Path(self.dir, 'avail.tar.gz')
+        with tarfile.open(self.tarball_path, mode='w:gz') as tar:
+            member = tarfile.TarInfo('data-avail')
+            member.size = len(b'binary')
+            member.mode = 0o755
+            tar.addfile(member, io.BytesIO(b'binary'))
+        patcher = patch.object(tarball.c, 'BINARY_FILE', self.binary)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch.object(tarball.shutil, 'chown')
+    def test_binary_is_moved_into_place(self, chown):
+        Tarball(self.tarball_path, 'goldberg').extract_resources_from_tarball()
+        self.assertEqual(self.binary.read_bytes(), b'binary')
+        self.assertEqual(os.stat(self.binary).st_mode & 0o777, 0o755)
+        self.assertEqual(os.listdir(self.dir), ['polkadot'])
+
+    @patch.object(tarball.shutil, 'chown', side_effect=LookupError('no such user'))
+    def test_failed_install_leaves_no_new_binary(self, chown):
+        with self.assertRaises(LookupError):
+            Tarball(self.tarball_path, 'goldberg').extract_resources_from_tarball()
+        self.assertEqual(os.listdir(self.dir), ['avail.tar.gz'])
+
+    def test_missing_binary(self):
+        with tarfile.open(self.tarball_path, mode='w:gz') as tar:
+            tar.addfile(tarfile.TarInfo('README'), io.BytesIO(b''))
+        with self.assertRaisesRegex(ValueError, 'not found in tarball'):
+            Tarball(self.tarball_path, 'goldberg').extract_resources_from_tarball()
+        self.assertEqual(os.listdir(self.dir), ['avail.tar.gz'])
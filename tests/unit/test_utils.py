@@ -0,0 +1,361 @@
+# Copyright 2021 dwellir
+# See LICENSE file for licensing details.
+
+import hashlib
+import io
+import os
+import re
+import socket
+import tarfile
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+
+import utils
+
+
+class FileRequestHandler(BaseHTTPRequestHandler):
+    """Serves the file of its FileServer, with the byte range support and failures the server is set up for."""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', str(len(self.server.data)))
+        if self.server.accept_ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+
+    def do_GET(self):
+        byte_range = self.headers.get('Range')
+        # Count the byte ranges that are served at the same time.
+        active = 1 if byte_range else 0
+        with self.server.lock:
+            self.server.requests.append(byte_range)
+            self.server.active += active
+            self.server.max_active = max(self.server.max_active, self.server.active)
+        try:
+            self.__get(byte_range)
+        finally:
+            with self.server.lock:
+                self.server.active -= active
+
+    def __get(self, byte_range):
+        if self.server.status != 200:
+            self.__send(self.server.status, b'error page ' * 100000)
+            return
+        match = re.match(r'bytes=(\d+)-(\d*)', byte_range or '')
+        if match and self.server.serve_ranges:
+            start = int(match[1])
+            end = int(match[2]) if match[2] else len(self.server.data) - 1
+            # A misbehaving server answers with another range than the one requested.
+            range_start = start + 1 if self.server.wrong_content_range else start
+            self.__send(206, self.server.data[start:end + 1], {'Content-Range': f'bytes {range_start}-{end}/{len(self.server.data)}'})
+        else:
+            self.__send(200, self.server.data)
+
+    def __send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        if self.server.accept_ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        time.sleep(self.server.delay)
+        if self.__drop():
+            # Drop the connection halfway through the body.
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        self.wfile.write(body)
+
+    def __drop(self) -> bool:
+        with self.server.lock:
+            if self.server.full_responses > 0:
+                self.server.full_responses -= 1
+                return False
+            if self.server.drops > 0:
+                self.server.drops -= 1
+                return True
+        return False
+
+
+class FileServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FileRequestHandler)
+        self.lock = threading.Lock()
+        self.reset(b'')
+
+    def reset(self, data: bytes):
+        self.data = data
+        self.status = 200
+        self.accept_ranges = True
+        self.serve_ranges = True
+        self.wrong_content_range = False
+        self.drops = 0
+        # Responses that are sent in full before any is dropped.
+        self.full_responses = 0
+        self.delay = 0
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    def handle_error(self, request, client_address):
+        # The client closing a connection the server still writes to is expected in these tests.
+        pass
+
+
+class TestDownloads(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FileServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}/file'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        # Large enough that half of it spans more than one 1 MiB chunk.
+        self.data = os.urandom(4 * 1024 * 1024 + 1)
+        self.server.reset(self.data)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.filepath = Path(temp_dir.name, 'file')
+
+    def download(self) -> str:
+        return utils._download_stream(self.url, self.filepath)
+
+    def assertDownloaded(self, file_hash: str):
+        self.assertEqual(file_hash, hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(self.filepath.read_bytes(), self.data)
+
+    def ranged_download_size(self) -> int:
+        with utils._SESSION.get(self.url, stream=True) as response:
+            return utils._ranged_download_size(response)
+
+    def test_ranged_download_size(self):
+        with patch.object(utils, 'RANGED_DOWNLOAD_MIN_SIZE', 1):
+            self.assertEqual(self.ranged_download_size(), len(self.data))
+            self.server.accept_ranges = False
+            self.assertEqual(self.ranged_download_size(), 0)
+        # Files below the threshold are downloaded as a single stream.
+        self.server.accept_ranges = True
+        self.assertEqual(self.ranged_download_size(), 0)
+
+    def test_single_stream(self):
+        # Small files are downloaded with a single request, without probing for byte range support first.
+        self.assertDownloaded(self.download())
+        self.assertEqual(self.server.requests, [None])
+
+    @patch.object(utils, 'RANGED_DOWNLOAD_PARTS', 4)
+    @patch.object(utils, 'RANGED_DOWNLOAD_MIN_SIZE', 1)
+    def test_ranges_are_written_at_their_offsets(self):
+        self.assertDownloaded(self.download())
+        # The first request shows that the server supports byte ranges and is closed for them.
+        self.assertEqual(self.server.requests[0], None)
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertNotIn(None, self.server.requests[1:])
+
+    @patch.object(utils, 'RANGED_DOWNLOAD_PARTS', 4)
+    @patch.object(utils, 'RANGED_DOWNLOAD_MIN_SIZE', 1)
+    def test_ranges_share_a_bounded_number_of_connections(self):
+        self.server.delay = 0.05
+        with patch.object(utils, '_RANGE_SLOTS', threading.BoundedSemaphore(3)):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                paths = [Path(self.filepath.parent, name) for name in ('a', 'b')]
+                file_hashes = list(executor.map(lambda path: utils._download_stream(self.url, path), paths))
+        self.assertEqual(file_hashes, [hashlib.sha256(self.data).hexdigest()] * 2)
+        self.assertEqual(len(self.server.requests), 2 + 2 * 4)
+        self.assertLessEqual(self.server.max_active, 3)
+
+    def test_failed_range_stops_the_others(self):
+        stopped = []
+
+        def download_range(url, fd, start, end, stop):
+            if start == 0:
+                return False
+            stopped.append(stop.wait(5))
+            return True
+        with patch.object(utils, '_download_range', side_effect=download_range):
+            self.assertFalse(utils._download_all_ranges(self.url, 0, [(0, 9), (10, 19), (20, 29)]))
+        self.assertEqual(stopped, [True, True])
+
+    @patch.object(utils, 'RANGED_DOWNLOAD_PARTS', 4)
+    @patch.object(utils, 'RANGED_DOWNLOAD_MIN_SIZE', 1)
+    def test_ranges_fall_back_to_single_stream_on_200(self):
+        self.server.serve_ranges = False
+        self.assertDownloaded(self.download())
+        self.assertEqual(self.server.requests[-1], None)
+
+    @patch.object(utils, 'RANGED_DOWNLOAD_PARTS', 4)
+    @patch.object(utils, 'RANGED_DOWNLOAD_MIN_SIZE', 1)
+    def test_ranges_fall_back_to_single_stream_on_wrong_content_range(self):
+        self.server.wrong_content_range = True
+        self.assertDownloaded(self.download())
+        self.assertEqual(self.server.requests[-1], None)
+
+    @patch.object(utils, 'RANGED_DOWNLOAD_PARTS', 2)
+    @patch.object(utils, 'RANGED_DOWNLOAD_MIN_SIZE', 1)
+    def test_dropped_range_is_resumed_from_its_offset(self):
+        self.server.full_responses = 1
+        self.server.drops = 1
+        self.assertDownloaded(self.download())
+        part_starts = {None, 'bytes=0-2097152', 'bytes=2097153-4194304'}
+        resumed = [byte_range for byte_range in self.server.requests if byte_range not in part_starts]
+        # Half of a 2 MiB part is one whole 1 MiB chunk, so the range is resumed one chunk in.
+        self.assertEqual(len(resumed), 1)
+        self.assertIn(resumed[0], ('bytes=1048576-2097152', 'bytes=3145729-4194304'))
+
+    @patch.object(utils, 'RANGED_DOWNLOAD_PARTS', 2)
+    @patch.object(utils, 'RANGED_DOWNLOAD_MIN_SIZE', 1)
+    @patch.object(utils, 'DOWNLOAD_RESUMES', 1)
+    def test_failing_ranges_fall_back_to_single_stream(self):
+        # Both ranges are dropped on every attempt, the single stream after them is not.
+        self.server.full_responses = 1
+        self.server.drops = 4
+        self.assertDownloaded(self.download())
+        self.assertEqual(self.server.requests[0], None)
+        self.assertEqual(self.server.requests[-1], None)
+        self.assertNotIn(None, self.server.requests[1:-1])
+
+    def test_dropped_stream_is_resumed(self):
+        self.server.drops = 2
+        self.assertDownloaded(self.download())
+        # Each drop comes halfway through what is left, after the whole 1 MiB chunks before it were written.
+        self.assertEqual(self.server.requests, [None, 'bytes=2097152-', 'bytes=3145728-'])
+
+    def test_dropped_stream_fails_without_ranges(self):
+        self.server.accept_ranges = False
+        self.server.drops = 1
+        with self.assertRaises(requests.RequestException):
+            self.download()
+        self.assertFalse(self.filepath.exists())
+
+    def test_dropped_stream_fails_after_too_many_resumes(self):
+        self.server.drops = utils.DOWNLOAD_RESUMES + 1
+        with patch.object(utils, 'DOWNLOAD_RESUMES', 1):
+            with self.assertRaises(requests.RequestException):
+                self.download()
+        self.assertFalse(self.filepath.exists())
+
+    @patch.object(utils, 'MAX_DOWNLOAD_SIZE', 1024)
+    def test_size_cap(self):
+        with self.assertRaisesRegex(ValueError, 'larger than'):
+            self.download()
+        self.assertFalse(self.filepath.exists())
+        with patch.object(utils, 'RANGED_DOWNLOAD_MIN_SIZE', 1):
+            with self.assertRaisesRegex(ValueError, 'larger than'):
+                self.download()
+        self.assertFalse(self.filepath.exists())
+
+    def test_error_text_is_bounded(self):
+        self.server.status = 500
+        with self.assertRaises(ValueError) as error:
+            self.download()
+        self.assertLess(len(str(error.exception)), utils.ERROR_TEXT_SIZE + 100)
+        self.assertFalse(self.filepath.exists())
+
+    @patch.object(utils, 'MAX_DOWNLOAD_SIZE', 1024)
+    def test_size_limited_reader(self):
+        reader = utils._SizeLimitedReader(io.BytesIO(b'x' * 2048), 'Download of file failed with: {}')
+        self.assertEqual(len(reader.read(1024)), 1024)
+        with self.assertRaisesRegex(ValueError, 'larger than'):
+            reader.read(1024)
+
+    def test_tarball_size_cap(self):
+        tarball = io.BytesIO()
+        with tarfile.open(fileobj=tarball, mode='w:gz') as tar:
+            member = tarfile.TarInfo('runtime.wasm')
+            member.size = len(self.data)
+            tar.addfile(member, io.BytesIO(self.data))
+        self.server.reset(tarball.getvalue())
+        with patch.object(utils, 'MAX_DOWNLOAD_SIZE', 1024 * 1024):
+            with self.assertRaisesRegex(ValueError, 'larger than'):
+                utils.extract_tarball_from_url(self.url, str(self.filepath.parent))
+        utils.extract_tarball_from_url(self.url, str(self.filepath.parent))
+        self.assertEqual(Path(self.filepath.parent, 'runtime.wasm').read_bytes(), self.data)
+
+
+class TestChownToUser(unittest.TestCase):
+
+    def test_missing_user_is_tolerated(self):
+        with tempfile.NamedTemporaryFile() as f, patch.object(utils.c, 'USER', 'no-such-user-for-tests'):
+            utils._user_ids.cache_clear()
+            self.addCleanup(utils._user_ids.cache_clear)
+            utils.chown_to_user(Path(f.name))
+            self.assertEqual(os.stat(f.name).st_uid, os.getuid())
+
+
+class TestBinaryMd5sum(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.binary = Path(temp_dir.name, 'polkadot')
+        self.binary.write_bytes(b'binary')
+        patcher = patch.object(utils.c, 'BINARY_FILE', self.binary)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        utils._get_binary_md5sum.cache_clear()
+        self.addCleanup(utils._get_binary_md5sum.cache_clear)
+
+    def test_hash_is_kept_in_the_stored_state(self):
+        stored_hash = {}
+        self.assertEqual(utils.get_binary_md5sum(stored_hash), hashlib.md5(b'binary').hexdigest())
+        self.assertEqual(stored_hash['md5'], hashlib.md5(b'binary').hexdigest())
+        # A later hook reuses the stored hash without reading the binary again.
+        utils._get_binary_md5sum.cache_clear()
+        with patch.object(utils, '_file_hash') as file_hash:
+            self.assertEqual(utils.get_binary_md5sum(stored_hash), hashlib.md5(b'binary').hexdigest())
+        file_hash.assert_not_called()
+        self.assertEqual(os.listdir(self.binary.parent), ['polkadot'])
+
+    def test_new_binary_is_hashed_again(self):
+        stored_hash = {}
+        utils.get_binary_md5sum(stored_hash)
+        new_binary = self.binary.with_suffix('.new')
+        new_binary.write_bytes(b'new binary')
+        os.replace(new_binary, self.binary)
+        self.assertEqual(utils.get_binary_md5sum(stored_hash), hashlib.md5(b'new binary').hexdigest())
+        self.assertEqual(stored_hash['md5'], hashlib.md5(b'new binary').hexdigest())
+
+
+class TestSha256Checksums(unittest.TestCase):
+
+    def setUp(self):
+        self.binaries = [
+            ('url', 'sha256-url', None, Path('/home/polkadot/polkadot'), 'a' * 64),
+            ('url', 'sha256-url', None, Path('/home/polkadot/polkadot-execute-worker'), 'b' * 64),
+        ]
+
+    def test_manifest_is_matched_on_file_names(self):
+        manifest = f"{'a' * 64}  polkadot\n{'b' * 64}  polkadot-execute-worker\n"
+        utils.perform_sha256_checksums(self.binaries, 'sha256-url', {'sha256-url': manifest})
+
+    def test_manifest_with_wrong_hash(self):
+        manifest = f"{'a' * 64}  polkadot\n{'c' * 64}  polkadot-execute-worker\n"
+        with self.assertRaisesRegex(ValueError, 'wrong hash'):
+            utils.perform_sha256_checksums(self.binaries, 'sha256-url', {'sha256-url': manifest})
+
+    def test_manifest_without_binary(self):
+        manifest = f"{'a' * 64}  polkadot\n"
+        with self.assertRaisesRegex(ValueError, 'Could not find target hash'):
+            utils.perform_sha256_checksums(self.binaries, 'sha256-url', {'sha256-url': manifest})